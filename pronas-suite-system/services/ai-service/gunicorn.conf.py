@@ -0,0 +1,11 @@
+"""Configuração do gunicorn do ai-service"""
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    """Descarta as métricas "live" do worker encerrado
+
+    Sem isso, os gauges livemax/livesum de um worker morto continuam sendo
+    agregados pelo MultiProcessCollector até o diretório ser limpo.
+    """
+    multiprocess.mark_process_dead(worker.pid)
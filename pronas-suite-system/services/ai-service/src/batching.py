@@ -0,0 +1,106 @@
+from typing import Any, Callable, List, Optional, Tuple
+from prometheus_client import Gauge
+import asyncio
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limites padrão dos lotes de inferência
+PRONAS_MAX_BATCH = int(os.getenv("PRONAS_MAX_BATCH", 8))
+PRONAS_MAX_WAIT_MS = float(os.getenv("PRONAS_MAX_WAIT_MS", 20))
+
+# Com vários workers, expõe o maior valor entre os processos vivos
+BATCH_SIZE = Gauge(
+    "ai_batch_size", "Itens no último lote processado", ["batcher"],
+    multiprocess_mode="livemax"
+)
+BATCH_WAIT_MS = Gauge(
+    "ai_batch_wait_ms", "Tempo de formação do último lote (ms)", ["batcher"],
+    multiprocess_mode="livemax"
+)
+
+
+class BatchAnalyzer:
+    """Agrupa itens de chamadas concorrentes em lotes
+
+    Cada chamada a ``submit`` entra em uma fila; uma tarefa em segundo plano
+    junta até ``max_batch`` itens (ou o que chegar em ``max_wait_ms``),
+    processa o lote com ``handler`` em uma thread e devolve a cada chamador
+    o seu resultado. ``handler`` recebe a lista de itens e deve retornar os
+    resultados na mesma ordem.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch: int = 32,
+        max_wait_ms: float = 10,
+        name: Optional[str] = None
+    ):
+        self.handler = handler
+        self.name = name or getattr(handler, "__name__", "batch")
+        # Métricas já rotuladas: evita o .labels() a cada lote
+        self._size_gauge = BATCH_SIZE.labels(self.name)
+        self._wait_gauge = BATCH_WAIT_MS.labels(self.name)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """Enfileira um item e aguarda o resultado do seu lote"""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        """Consome a fila formando lotes"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            started = loop.time()
+            deadline = started + self.max_wait
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self._size_gauge.set(len(batch))
+            self._wait_gauge.set((loop.time() - started) * 1000)
+            await self._process(batch)
+
+    async def _process(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """Processa um lote e distribui os resultados"""
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.to_thread(self.handler, items)
+        except Exception as e:
+            logger.error(f"Erro ao processar lote de {len(items)} itens: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def close(self):
+        """Encerra a tarefa de processamento"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
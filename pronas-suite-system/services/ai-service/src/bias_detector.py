@@ -1,19 +1,91 @@
 import numpy as np
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from bisect import bisect_right
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Tuple, Optional, Final
+from types import MappingProxyType
+import math
+import asyncio
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Padrões conhecidos de viés (baseado em dados históricos fictícios)
+APPROVAL_RATES: Final = MappingProxyType({
+    'university': 0.75,
+    'hospital': 0.70,
+    'ngo': 0.45,
+    'private': 0.40
+})
+AVG_APPROVAL: Final = sum(APPROVAL_RATES.values()) / len(APPROVAL_RATES)
+
+# Distribuição regional dos projetos aprovados
+REGIONAL_DISTRIBUTION: Final = MappingProxyType({
+    'sudeste': 0.45,
+    'sul': 0.25,
+    'nordeste': 0.15,
+    'centro-oeste': 0.10,
+    'norte': 0.05
+})
+EXPECTED_DISTRIBUTION: Final = 1.0 / len(REGIONAL_DISTRIBUTION)
+
+# Intervalos simulados das métricas de equidade: paridade demográfica,
+# igualdade de oportunidade e impacto desproporcional
+FAIRNESS_LOW = np.array([0.7, 0.75, 0.8])
+FAIRNESS_HIGH = np.array([0.9, 0.95, 1.2])
+
+# Features usadas pelo detector de anomalias: orçamento, nº de objetivos
+# e tamanho da equipe
+N_FEATURES = 3
+
+# Tamanho mínimo do histórico para o primeiro retreino do detector
+MIN_RETRAIN_SAMPLES = 128
+
+# Faixas de orçamento e suas taxas de aprovação (simulado): limites
+# superiores de cada faixa e a taxa correspondente, incluindo a última
+# faixa aberta (acima de R$ 1.000.000)
+BUDGET_BOUNDS: Final = (100000, 500000, 1000000)
+BUDGET_APPROVAL_RATES: Final = (0.35, 0.65, 0.70, 0.45)
+
+def score_complexity(budget: float, n_specific: int, n_timeline: int, n_team: int) -> int:
+    """Conta quantos fatores de complexidade o projeto apresenta"""
+    return (
+        (n_specific > 5)
+        + (budget > 1000000)
+        + (n_timeline > 8)
+        + (n_team > 10)
+    )
+
+
+@dataclass(slots=True)
+class BiasResult:
+    """Resultado de um detector de viés"""
+    type: str
+    detected: bool = False
+    score: float = 0.0
+    description: str = ""
+
+
 class BiasDetector:
     def __init__(self):
-        self.isolation_forest = IsolationForest(contamination=0.1, random_state=42)
+        # max_features=1.0 mantém o caminho rápido de indexação do bagging;
+        # sem n_jobs: uma thread por fit, sem disputar CPUs entre os workers
+        self.isolation_forest = IsolationForest(
+            contamination=0.1, random_state=42, max_features=1.0
+        )
         self.scaler = StandardScaler()
         self.bias_patterns = {}
-        self.historical_data = []
+        self._rng = np.random.default_rng(42)
+        # Instância compartilhada entre requisições: protege o histórico
+        self._lock = asyncio.Lock()
+        
+        # Features do histórico em um buffer contíguo que cresce por duplicação
+        self._feat_buf = np.empty((128, N_FEATURES), dtype=np.float32)
+        self._n = 0
+        
+        # Retreinar apenas quando o histórico dobrar de tamanho
+        self._next_retrain = MIN_RETRAIN_SAMPLES
         
     async def analyze(self, project_data: Dict) -> Dict:
         """Analisa projeto em busca de vieses"""
@@ -25,192 +97,156 @@ class BiasDetector:
             "fairness_metrics": {}
         }
         
-        # Detectar viés institucional
-        institutional_bias = await self._detect_institutional_bias(project_data)
-        if institutional_bias['detected']:
-            analysis['patterns'].append(institutional_bias)
-        
-        # Detectar viés geográfico
-        geographic_bias = await self._detect_geographic_bias(project_data)
-        if geographic_bias['detected']:
-            analysis['patterns'].append(geographic_bias)
-        
-        # Detectar viés de complexidade
-        complexity_bias = await self._detect_complexity_bias(project_data)
-        if complexity_bias['detected']:
-            analysis['patterns'].append(complexity_bias)
-        
-        # Detectar viés orçamentário
-        budget_bias = await self._detect_budget_bias(project_data)
-        if budget_bias['detected']:
-            analysis['patterns'].append(budget_bias)
+        # Detectores são independentes entre si: executar concorrentemente
+        (
+            institutional_bias,
+            geographic_bias,
+            complexity_bias,
+            budget_bias,
+            fairness_metrics,
+        ) = await asyncio.gather(
+            self._detect_institutional_bias(project_data),
+            self._detect_geographic_bias(project_data),
+            self._detect_complexity_bias(project_data),
+            self._detect_budget_bias(project_data),
+            self._calculate_fairness_metrics(project_data),
+        )
+        
+        analysis['patterns'] = [
+            p for p in (
+                institutional_bias,
+                geographic_bias,
+                complexity_bias,
+                budget_bias,
+            )
+            if p.detected
+        ]
         
         # Calcular score geral de viés
         if analysis['patterns']:
             analysis['bias_detected'] = True
-            analysis['bias_score'] = np.mean([p['score'] for p in analysis['patterns']])
+            # No máximo 4 valores: soma em Python evita o custo fixo do np.mean
+            scores = [p.score for p in analysis['patterns']]
+            analysis['bias_score'] = math.fsum(scores) / len(scores)
             analysis['recommendations'] = await self._generate_bias_recommendations(
                 analysis['patterns']
             )
         
         # Métricas de equidade
-        analysis['fairness_metrics'] = await self._calculate_fairness_metrics(project_data)
+        analysis['fairness_metrics'] = fairness_metrics
+        
+        # Serializar apenas na saída
+        analysis['patterns'] = [asdict(p) for p in analysis['patterns']]
         
         return analysis
     
-    async def _detect_institutional_bias(self, project_data: Dict) -> Dict:
+    async def _detect_institutional_bias(self, project_data: Dict) -> BiasResult:
         """Detecta viés relacionado ao tipo de instituição"""
-        bias_result = {
-            "type": "institutional",
-            "detected": False,
-            "score": 0.0,
-            "description": ""
-        }
+        bias_result = BiasResult(type="institutional")
         
         # Simular análise baseada em dados históricos
         institution_type = project_data.get('institution_type', '')
         
-        # Padrões conhecidos de viés (baseado em dados históricos fictícios)
-        approval_rates = {
-            'university': 0.75,
-            'hospital': 0.70,
-            'ngo': 0.45,
-            'private': 0.40
-        }
-        
-        avg_approval = np.mean(list(approval_rates.values()))
-        
-        if institution_type in approval_rates:
-            rate = approval_rates[institution_type]
-            if abs(rate - avg_approval) > 0.15:
-                bias_result['detected'] = True
-                bias_result['score'] = abs(rate - avg_approval)
-                bias_result['description'] = (
+        rate = APPROVAL_RATES.get(institution_type)
+        if rate is not None:
+            deviation = math.fabs(rate - AVG_APPROVAL)
+            if deviation > 0.15:
+                bias_result.detected = True
+                bias_result.score = deviation
+                bias_result.description = (
                     f"Instituições do tipo '{institution_type}' têm taxa de aprovação "
-                    f"{'superior' if rate > avg_approval else 'inferior'} à média"
+                    f"{'superior' if rate > AVG_APPROVAL else 'inferior'} à média"
                 )
         
         return bias_result
     
-    async def _detect_geographic_bias(self, project_data: Dict) -> Dict:
+    async def _detect_geographic_bias(self, project_data: Dict) -> BiasResult:
         """Detecta viés geográfico"""
-        bias_result = {
-            "type": "geographic",
-            "detected": False,
-            "score": 0.0,
-            "description": ""
-        }
+        bias_result = BiasResult(type="geographic")
         
         # Análise por região
         region = project_data.get('region', '')
         
-        regional_distribution = {
-            'sudeste': 0.45,
-            'sul': 0.25,
-            'nordeste': 0.15,
-            'centro-oeste': 0.10,
-            'norte': 0.05
-        }
-        
-        expected_distribution = 1 / len(regional_distribution)
-        
-        if region.lower() in regional_distribution:
-            actual = regional_distribution[region.lower()]
-            if abs(actual - expected_distribution) > 0.1:
-                bias_result['detected'] = True
-                bias_result['score'] = abs(actual - expected_distribution)
-                bias_result['description'] = (
-                    f"Região {region} está {'sobre' if actual > expected_distribution else 'sub'}"
+        actual = REGIONAL_DISTRIBUTION.get(region.lower())
+        if actual is not None:
+            deviation = math.fabs(actual - EXPECTED_DISTRIBUTION)
+            if deviation > 0.1:
+                bias_result.detected = True
+                bias_result.score = deviation
+                bias_result.description = (
+                    f"Região {region} está {'sobre' if actual > EXPECTED_DISTRIBUTION else 'sub'}"
                     f"-representada nos projetos aprovados"
                 )
         
         return bias_result
     
-    async def _detect_complexity_bias(self, project_data: Dict) -> Dict:
+    async def _detect_complexity_bias(self, project_data: Dict) -> BiasResult:
         """Detecta viés relacionado à complexidade do projeto"""
-        bias_result = {
-            "type": "complexity",
-            "detected": False,
-            "score": 0.0,
-            "description": ""
-        }
+        bias_result = BiasResult(type="complexity")
         
         # Calcular complexidade do projeto
-        complexity_score = 0
-        
-        # Fatores de complexidade
-        if len(project_data.get('objectives', {}).get('specific', [])) > 5:
-            complexity_score += 1
-        if project_data.get('budget', {}).get('total', 0) > 1000000:
-            complexity_score += 1
-        if len(project_data.get('timeline', [])) > 8:
-            complexity_score += 1
-        if len(project_data.get('team', [])) > 10:
-            complexity_score += 1
+        complexity_score = score_complexity(
+            project_data.get('budget', {}).get('total', 0),
+            len(project_data.get('objectives', {}).get('specific', [])),
+            len(project_data.get('timeline', [])),
+            len(project_data.get('team', []))
+        )
         
         # Verificar se projetos complexos são favorecidos/desfavorecidos
         if complexity_score >= 3:
-            bias_result['detected'] = True
-            bias_result['score'] = 0.3
-            bias_result['description'] = (
+            bias_result.detected = True
+            bias_result.score = 0.3
+            bias_result.description = (
                 "Projetos com alta complexidade tendem a ter tratamento diferenciado"
             )
         
         return bias_result
     
-    async def _detect_budget_bias(self, project_data: Dict) -> Dict:
+    async def _detect_budget_bias(self, project_data: Dict) -> BiasResult:
         """Detecta viés relacionado ao orçamento"""
-        bias_result = {
-            "type": "budget",
-            "detected": False,
-            "score": 0.0,
-            "description": ""
-        }
+        bias_result = BiasResult(type="budget")
         
         budget = project_data.get('budget', {}).get('total', 0)
-        
-        # Faixas de orçamento e suas taxas de aprovação (simulado)
-        budget_ranges = [
-            (0, 100000, 0.35),
-            (100000, 500000, 0.65),
-            (500000, 1000000, 0.70),
-            (1000000, float('inf'), 0.45)
-        ]
-        
-        for min_val, max_val, approval_rate in budget_ranges:
-            if min_val <= budget < max_val:
-                if approval_rate < 0.4 or approval_rate > 0.6:
-                    bias_result['detected'] = True
-                    bias_result['score'] = abs(approval_rate - 0.5)
-                    bias_result['description'] = (
-                        f"Projetos na faixa de R$ {min_val:,.0f} a R$ {max_val:,.0f} "
-                        f"têm taxa de aprovação {'alta' if approval_rate > 0.6 else 'baixa'}"
-                    )
-                break
+        if budget < 0:
+            return bias_result
+        
+        # Localizar a faixa do orçamento com uma busca binária
+        idx = bisect_right(BUDGET_BOUNDS, budget)
+        approval_rate = BUDGET_APPROVAL_RATES[idx]
+        
+        if approval_rate < 0.4 or approval_rate > 0.6:
+            min_val = BUDGET_BOUNDS[idx - 1] if idx > 0 else 0
+            max_val = BUDGET_BOUNDS[idx] if idx < len(BUDGET_BOUNDS) else float('inf')
+            bias_result.detected = True
+            bias_result.score = math.fabs(approval_rate - 0.5)
+            bias_result.description = (
+                f"Projetos na faixa de R$ {min_val:,.0f} a R$ {max_val:,.0f} "
+                f"têm taxa de aprovação {'alta' if approval_rate > 0.6 else 'baixa'}"
+            )
         
         return bias_result
     
-    async def _generate_bias_recommendations(self, patterns: List[Dict]) -> List[str]:
+    async def _generate_bias_recommendations(self, patterns: List[BiasResult]) -> List[str]:
         """Gera recomendações para mitigar vieses detectados"""
         recommendations = []
         
         for pattern in patterns:
-            if pattern['type'] == 'institutional':
+            if pattern.type == 'institutional':
                 recommendations.append(
                     "Considere revisar os critérios de avaliação para garantir "
                     "equidade entre diferentes tipos de instituições"
                 )
-            elif pattern['type'] == 'geographic':
+            elif pattern.type == 'geographic':
                 recommendations.append(
                     "Ajuste o projeto para alinhar com a distribuição geográfica "
                     "esperada ou justifique a concentração regional"
                 )
-            elif pattern['type'] == 'complexity':
+            elif pattern.type == 'complexity':
                 recommendations.append(
                     "Simplifique a estrutura do projeto ou divida em fases menores "
                     "para melhorar as chances de aprovação"
                 )
-            elif pattern['type'] == 'budget':
+            elif pattern.type == 'budget':
                 recommendations.append(
                     "Revise o orçamento para alinhar com faixas de maior probabilidade "
                     "de aprovação ou justifique detalhadamente os valores"
@@ -220,61 +256,63 @@ class BiasDetector:
     
     async def _calculate_fairness_metrics(self, project_data: Dict) -> Dict:
         """Calcula métricas de equidade"""
-        metrics = {
-            "demographic_parity": 0.0,
-            "equal_opportunity": 0.0,
-            "disparate_impact": 0.0
-        }
-        
         # Simulação de cálculo de métricas
         # Em produção, isso seria baseado em dados reais
         
-        # Paridade demográfica
-        metrics['demographic_parity'] = np.random.uniform(0.7, 0.9)
-        
-        # Igualdade de oportunidade
-        metrics['equal_opportunity'] = np.random.uniform(0.75, 0.95)
+        # Uma única chamada ao gerador para as três métricas
+        demographic_parity, equal_opportunity, disparate_impact = (
+            self._rng.uniform(FAIRNESS_LOW, FAIRNESS_HIGH).tolist()
+        )
         
-        # Impacto desproporcional
-        metrics['disparate_impact'] = np.random.uniform(0.8, 1.2)
+        metrics = {
+            "demographic_parity": demographic_parity,
+            "equal_opportunity": equal_opportunity,
+            "disparate_impact": disparate_impact
+        }
         
         return metrics
     
     async def learn_from_feedback(self, project_id: str, outcome: str, features: Dict):
         """Aprende com feedback para melhorar detecção de viés"""
-        feedback_entry = {
-            "project_id": project_id,
-            "outcome": outcome,
-            "features": features,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        self.historical_data.append(feedback_entry)
-        
-        # Retreinar modelo de detecção se houver dados suficientes
-        if len(self.historical_data) >= 100:
-            await self._retrain_bias_detector()
+        async with self._lock:
+            self._append_features(features)
+            
+            # Retreinar modelo de detecção se houver dados suficientes; o
+            # intervalo dobra a cada retreino, mantendo o custo amortizado baixo
+            if self._n >= self._next_retrain:
+                await self._retrain_bias_detector()
+                self._next_retrain *= 2
+    
+    def _append_features(self, features: Dict):
+        """Grava o vetor de features do feedback no buffer do histórico"""
+        if self._n == len(self._feat_buf):
+            grown = np.empty((2 * len(self._feat_buf), N_FEATURES), dtype=np.float32)
+            grown[:self._n] = self._feat_buf
+            self._feat_buf = grown
+        
+        self._feat_buf[self._n] = (
+            features.get('budget', 0),
+            len(features.get('objectives', [])),
+            len(features.get('team', [])),
+            # ... mais features
+        )
+        self._n += 1
     
     async def _retrain_bias_detector(self):
         """Retreina detector de viés com novos dados"""
         logger.info("Retreinando detector de viés...")
         
-        # Preparar dados
-        df = pd.DataFrame(self.historical_data)
+        # Features já estão prontas no buffer (o _lock impede novas gravações)
+        features = self._feat_buf[:self._n]
         
-        # Extrair features
-        features = []
-        for entry in self.historical_data:
-            feature_vector = [
-                entry['features'].get('budget', 0),
-                len(entry['features'].get('objectives', [])),
-                len(entry['features'].get('team', [])),
-                # ... mais features
-            ]
-            features.append(feature_vector)
+        # Treino fora do event loop
+        await asyncio.to_thread(self._fit_bias_detector, features)
         
-        # Normalizar e treinar
+        logger.info("Detector de viés retreinado com sucesso")
+    
+    def _fit_bias_detector(self, features: np.ndarray):
+        """Normaliza as features e treina o IsolationForest"""
         features_scaled = self.scaler.fit_transform(features)
-        self.isolation_forest.fit(features_scaled)
-        
-        logger.info("Detector de viés retreinado com sucesso")
\ No newline at end of file
+        # Entrada densa, contígua e float32 evita cópias na validação do sklearn
+        features_scaled = np.ascontiguousarray(features_scaled, dtype=np.float32)
+        self.isolation_forest.fit(features_scaled)
\ No newline at end of file
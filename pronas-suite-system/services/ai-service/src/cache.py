@@ -0,0 +1,78 @@
+from typing import Any, Awaitable, Callable
+from prometheus_client import Counter
+import redis.asyncio as redis
+import orjson
+import hashlib
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Tempo de vida das entradas, em segundos
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", 3600))
+GUIDELINES_CACHE_TTL = int(os.getenv("GUIDELINES_CACHE_TTL", 86400))
+
+CACHE_HITS = Counter("ai_cache_hits_total", "Acertos no cache de resultados", ["cache"])
+CACHE_MISSES = Counter("ai_cache_misses_total", "Falhas no cache de resultados", ["cache"])
+
+# Contadores já rotulados para os caches conhecidos: o caminho quente faz
+# apenas .inc(), sem o .labels() por chamada
+KNOWN_CACHES = ("ocr", "guidelines")
+_HITS = {name: CACHE_HITS.labels(name) for name in KNOWN_CACHES}
+_MISSES = {name: CACHE_MISSES.labels(name) for name in KNOWN_CACHES}
+
+
+def cache_key(*parts: Any) -> str:
+    """Gera uma chave estável (sha256) a partir das partes informadas"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Cache de resultados de OCR/NLP no Redis
+
+    Indisponibilidade do Redis nunca falha a requisição: o resultado é
+    apenas recalculado.
+    """
+
+    def __init__(self, url: str = REDIS_URL):
+        self.client = redis.from_url(url)
+
+    async def get_or_compute(
+        self,
+        cache: str,
+        key: str,
+        ttl: int,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Retorna o valor em cache ou o calcula e armazena por ``ttl`` segundos"""
+        redis_key = f"{cache}:{key}"
+
+        try:
+            cached = await self.client.get(redis_key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache indisponível ({cache}): {str(e)}")
+            return await compute()
+
+        if cached is not None:
+            (_HITS.get(cache) or CACHE_HITS.labels(cache)).inc()
+            return orjson.loads(cached)
+
+        (_MISSES.get(cache) or CACHE_MISSES.labels(cache)).inc()
+        value = await compute()
+
+        try:
+            await self.client.setex(redis_key, ttl, orjson.dumps(value))
+        except redis.RedisError as e:
+            logger.warning(f"Falha ao gravar no cache ({cache}): {str(e)}")
+
+        return value
+
+    async def close(self):
+        """Fecha a conexão com o Redis"""
+        await self.client.aclose()
@@ -1,51 +1,227 @@
 from typing import Dict, List, Optional
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 import jinja2
 from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+from xml.sax.saxutils import escape
+import xlsxwriter
 import pdfkit
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
+import asyncio
+import copy
+import os
 import io
 import base64
+import tempfile
+from types import MappingProxyType
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Ambiente Jinja compartilhado: templates compilados ficam em cache entre
+# instâncias e requisições; o bytecode em disco poupa a compilação em
+# inicializações a frio
+JINJA_ENV = jinja2.Environment(
+    loader=jinja2.FileSystemLoader('templates/'),
+    auto_reload=False,
+    cache_size=400,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(tempfile.gettempdir()),
+)
+
+
+# Cada worker do gunicorn (WEB_CONCURRENCY) tem o próprio pool: dividir as
+# CPUs entre eles, em vez de um processo por núcleo em cada worker
+DOCUMENT_WORKERS = int(os.getenv(
+    "DOCUMENT_WORKERS",
+    max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)))
+))
+
+_document_pool: Optional[ProcessPoolExecutor] = None
+
+# Instância do gerador de cada processo do pool
+_worker_generator: Optional["DocumentGenerator"] = None
+
+
+def get_document_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de geração, criando-o no primeiro uso"""
+    global _document_pool
+    if _document_pool is None:
+        _document_pool = ProcessPoolExecutor(max_workers=DOCUMENT_WORKERS)
+    return _document_pool
+
+
+def shutdown_document_pool():
+    """Encerra o pool de processos de geração, se tiver sido criado"""
+    global _document_pool
+    if _document_pool is not None:
+        _document_pool.shutdown(cancel_futures=True)
+        _document_pool = None
+
+
+def _get_worker_generator() -> "DocumentGenerator":
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = DocumentGenerator()
+    return _worker_generator
+
+
+def _b64_buffer(buffer: io.BytesIO) -> str:
+    """Codifica o buffer em base64 sem copiá-lo antes para um bytes"""
+    with buffer.getbuffer() as view:
+        encoded = base64.b64encode(view)
+    
+    # Liberar o documento bruto antes de montar a string de retorno, para
+    # que os dois não fiquem em memória ao mesmo tempo
+    buffer.close()
+    return encoded.decode('ascii')
+
+
+# Funções de topo (serializáveis) executadas nos processos do pool; a
+# codificação base64 também acontece no processo filho
+def _build_proposal_docx(project_data: Dict) -> str:
+    return _b64_buffer(_get_worker_generator()._render_proposal_docx(project_data))
+
+
+def _build_proposal_pdf(project_data: Dict) -> str:
+    return _b64_buffer(_get_worker_generator()._render_proposal_pdf(project_data))
+
+
+def _build_budget_excel(project_data: Dict) -> str:
+    return _b64_buffer(_get_worker_generator()._render_budget_excel(project_data))
+
+
+# Seções de texto da proposta em PDF, na ordem de exibição
+PDF_TEXT_SECTIONS = ('justification', 'objectives', 'methodology')
+
+# Propriedades dos formatos da planilha de orçamento (os objetos de formato
+# do xlsxwriter pertencem a um workbook e não podem ser compartilhados)
+_XLSX_TITLE_FORMAT = MappingProxyType({'bold': True, 'font_size': 14})
+_XLSX_HEADER_FORMAT = MappingProxyType({'bold': True, 'bg_color': '#CCCCCC'})
+_XLSX_BOLD_FORMAT = MappingProxyType({'bold': True})
+
+
+@lru_cache(maxsize=256)
+def _pretty_category(category: str) -> str:
+    """Formata o nome de uma categoria ('recursos_humanos' -> 'Recursos Humanos')"""
+    return category.replace('_', ' ').title()
+
+
+_W_NSDECL = nsdecls('w')
+_BOLD_RPR = '<w:rPr><w:b/></w:rPr>'
+
+
+def _row_xml(values, bold_cols=()) -> str:
+    """Monta o XML de uma linha de tabela (w:tr) com todas as células"""
+    cells = ''.join(
+        '<w:tc><w:p><w:r>'
+        f'{_BOLD_RPR if i in bold_cols else ""}'
+        f'<w:t xml:space="preserve">{escape(str(value))}</w:t>'
+        '</w:r></w:p></w:tc>'
+        for i, value in enumerate(values)
+    )
+    return f'<w:tr {_W_NSDECL}>{cells}</w:tr>'
+
+
+def _bullets_xml(items, style_id: str) -> str:
+    """Monta o XML de uma lista de marcadores (um w:p por item)"""
+    return ''.join(
+        f'<w:p><w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+        f'<w:r><w:t xml:space="preserve">• {escape(str(item))}</w:t></w:r></w:p>'
+        for item in items
+    )
+
+
 class DocumentGenerator:
     def __init__(self):
-        self.jinja_env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader('templates/')
-        )
+        self.jinja_env = JINJA_ENV
         self.styles = getSampleStyleSheet()
+        # Documento base já configurado, criado no primeiro DOCX
+        self._doc_skeleton = None
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#003366'),
+            spaceAfter=30,
+            alignment=1  # Center
+        )
+        
+        # Seções da proposta: (título, handler, chave em project_data, padrão).
+        # Chave None passa o project_data inteiro ao handler
+        self._proposal_sections = (
+            ("1. IDENTIFICAÇÃO DO PROJETO", self._add_project_identification, None, dict),
+            ("2. JUSTIFICATIVA", self._add_plain_text, 'justification', str),
+            ("3. OBJETIVOS", self._add_objectives, 'objectives', dict),
+            ("4. METODOLOGIA", self._add_methodology, 'methodology', dict),
+            ("5. CRONOGRAMA", self._add_timeline, 'timeline', list),
+            ("6. ORÇAMENTO", self._add_budget, 'budget', dict),
+            ("7. RESULTADOS ESPERADOS", self._add_expected_results, 'expected_results', list),
+            ("8. EQUIPE", self._add_team, 'team', list),
+            ("9. INDICADORES DE AVALIAÇÃO", self._add_metrics, 'evaluation_metrics', list),
+            ("10. SUSTENTABILIDADE", self._add_sustainability, 'sustainability', dict),
+            ("11. ANÁLISE DE RISCOS", self._add_risks, 'risks', list),
+        )
         
     async def generate_documents(
         self, project_data: Dict, templates: List[str]
     ) -> Dict[str, str]:
         """Gera documentos do projeto em diferentes formatos"""
-        documents = {}
+        keys = []
+        tasks = []
         
         for template_name in templates:
             if template_name == "proposal":
-                documents["proposal_docx"] = await self.generate_proposal_docx(project_data)
-                documents["proposal_pdf"] = await self.generate_proposal_pdf(project_data)
+                keys.append("proposal_docx")
+                tasks.append(self.generate_proposal_docx(project_data))
+                keys.append("proposal_pdf")
+                tasks.append(self.generate_proposal_pdf(project_data))
             elif template_name == "budget":
-                documents["budget_xlsx"] = await self.generate_budget_excel(project_data)
+                keys.append("budget_xlsx")
+                tasks.append(self.generate_budget_excel(project_data))
             elif template_name == "workplan":
-                documents["workplan_pdf"] = await self.generate_workplan_pdf(project_data)
+                # O plano de trabalho é o mesmo PDF da proposta: se ela já
+                # foi pedida, reaproveitar o resultado em vez de gerar de novo
+                if "proposal" in templates:
+                    continue
+                keys.append("workplan_pdf")
+                tasks.append(self.generate_workplan_pdf(project_data))
+        
+        # Os formatos são independentes: gerar todos concorrentemente
+        results = await asyncio.gather(*tasks)
+        
+        documents = dict(zip(keys, results))
+        if "workplan" in templates and "proposal_pdf" in documents:
+            documents["workplan_pdf"] = documents["proposal_pdf"]
         
         return documents
     
+    async def _run_builder(self, builder, project_data: Dict) -> str:
+        """Executa um builder no pool de processos e retorna o arquivo em base64"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_document_pool(), builder, project_data)
+    
     async def generate_proposal_docx(self, project_data: Dict) -> str:
         """Gera proposta em formato DOCX"""
-        document = Document()
+        return await self._run_builder(_build_proposal_docx, project_data)
+    
+    def _render_proposal_docx(self, project_data: Dict) -> io.BytesIO:
+        """Monta a proposta DOCX (CPU-bound, executado no pool de processos)"""
+        # Ler de project_data uma única vez, antes de montar o documento
+        sections = [
+            (title, handler, project_data if key is None else project_data.get(key, default()))
+            for title, handler, key, default in self._proposal_sections
+        ]
         
-        # Configurar estilos
-        self._setup_document_styles(document)
+        document = self._new_document()
         
         # Capa
         self._add_cover_page(document, project_data)
@@ -56,46 +232,26 @@ class DocumentGenerator:
         
         # Seções do projeto
         document.add_page_break()
-        self._add_section(document, "1. IDENTIFICAÇÃO DO PROJETO", level=1)
-        self._add_project_identification(document, project_data)
-        
-        self._add_section(document, "2. JUSTIFICATIVA", level=1)
-        document.add_paragraph(project_data.get('justification', ''))
-        
-        self._add_section(document, "3. OBJETIVOS", level=1)
-        self._add_objectives(document, project_data.get('objectives', {}))
-        
-        self._add_section(document, "4. METODOLOGIA", level=1)
-        self._add_methodology(document, project_data.get('methodology', {}))
-        
-        self._add_section(document, "5. CRONOGRAMA", level=1)
-        self._add_timeline(document, project_data.get('timeline', []))
-        
-        self._add_section(document, "6. ORÇAMENTO", level=1)
-        self._add_budget(document, project_data.get('budget', {}))
-        
-        self._add_section(document, "7. RESULTADOS ESPERADOS", level=1)
-        self._add_expected_results(document, project_data.get('expected_results', []))
-        
-        self._add_section(document, "8. EQUIPE", level=1)
-        self._add_team(document, project_data.get('team', []))
-        
-        self._add_section(document, "9. INDICADORES DE AVALIAÇÃO", level=1)
-        self._add_metrics(document, project_data.get('evaluation_metrics', []))
-        
-        self._add_section(document, "10. SUSTENTABILIDADE", level=1)
-        self._add_sustainability(document, project_data.get('sustainability', {}))
-        
-        self._add_section(document, "11. ANÁLISE DE RISCOS", level=1)
-        self._add_risks(document, project_data.get('risks', []))
+        for title, handler, data in sections:
+            self._add_section(document, title, level=1)
+            handler(document, data)
         
         # Salvar documento
         buffer = io.BytesIO()
         document.save(buffer)
-        buffer.seek(0)
         
-        # Retornar como base64
-        return base64.b64encode(buffer.read()).decode('utf-8')
+        return buffer
+    
+    def _new_document(self):
+        """Retorna uma cópia do documento base, já com os estilos aplicados
+
+        Evita reler e reparsear o template padrão do python-docx a cada
+        proposta.
+        """
+        if self._doc_skeleton is None:
+            self._doc_skeleton = Document()
+            self._setup_document_styles(self._doc_skeleton)
+        return copy.deepcopy(self._doc_skeleton)
     
     def _setup_document_styles(self, document):
         """Configura estilos do documento"""
@@ -135,9 +291,9 @@ class DocumentGenerator:
         run.font.bold = True
         run.font.color.rgb = RGBColor(0, 0, 139)
         
-        # Espaçamento
-        for _ in range(10):
-            document.add_paragraph()
+        # Espaçamento (um único parágrafo, ~10 linhas em branco)
+        spacer = document.add_paragraph()
+        spacer.paragraph_format.space_after = Pt(240)
         
         # Instituição
         institution = document.add_paragraph()
@@ -178,23 +334,69 @@ class DocumentGenerator:
         """Adiciona uma seção ao documento"""
         document.add_heading(title, level=level)
     
-    def _add_project_identification(self, document, project_data: Dict):
-        """Adiciona identificação do projeto"""
-        table = document.add_table(rows=5, cols=2)
+    def _add_table(
+        self, document, rows: List[tuple], headers: Optional[List[str]] = None,
+        bold_cols=()
+    ):
+        """Adiciona uma tabela montando o XML de cada linha de uma vez
+
+        Evita o acesso célula a célula pelos proxies do python-docx; o
+        cabeçalho, se houver, sai em negrito.
+        """
+        n_cols = len(headers) if headers else len(rows[0])
+        table = document.add_table(rows=0, cols=n_cols)
         table.style = 'Light Grid'
         
+        tbl = table._tbl
+        if headers:
+            tbl.append(parse_xml(_row_xml(headers, bold_cols=range(n_cols))))
+        for row in rows:
+            tbl.append(parse_xml(_row_xml(row, bold_cols=bold_cols)))
+        
+        return table
+    
+    def _add_bullet_list(self, document, items):
+        """Adiciona uma lista de marcadores com um único parse de XML"""
+        if not items:
+            return
+        
+        # Resolver o estilo uma vez para a lista inteira
+        style_id = document.styles['List Bullet'].style_id
+        fragment = parse_xml(
+            f'<w:body {_W_NSDECL}>{_bullets_xml(items, style_id)}</w:body>'
+        )
+        
+        # Os parágrafos precisam ficar antes do w:sectPr final do corpo
+        body = document.element.body
+        sect_pr = body.sectPr
+        for paragraph in list(fragment):
+            if sect_pr is not None:
+                sect_pr.addprevious(paragraph)
+            else:
+                body.append(paragraph)
+    
+    def _add_project_identification(self, document, project_data: Dict):
+        """Adiciona identificação do projeto"""
+        timeline = project_data.get('timeline', [])
         data = [
             ("Título:", project_data.get('title', '')),
             ("Instituição:", project_data.get('institution_name', '')),
             ("CNPJ:", project_data.get('institution_cnpj', '')),
             ("Tipo de Projeto:", project_data.get('type', '')),
-            ("Duração:", f"{len(project_data.get('timeline', []))*3} meses")
+            ("Duração:", f"{len(timeline)*3} meses" if timeline else '')
         ]
         
-        for i, (label, value) in enumerate(data):
-            table.cell(i, 0).text = label
-            table.cell(i, 1).text = str(value)
-            table.cell(i, 0).paragraphs[0].runs[0].font.bold = True
+        # Omitir campos vazios (e a tabela, se nada estiver preenchido)
+        data = [(label, value) for label, value in data if value]
+        if not data:
+            return
+        
+        # Rótulos em negrito
+        self._add_table(document, data, bold_cols=(0,))
+    
+    def _add_plain_text(self, document, text: str):
+        """Adiciona um parágrafo de texto simples"""
+        document.add_paragraph(text)
     
     def _add_objectives(self, document, objectives: Dict):
         """Adiciona objetivos ao documento"""
@@ -202,8 +404,7 @@ class DocumentGenerator:
         document.add_paragraph(objectives.get('general', ''))
         
         document.add_heading('Objetivos Específicos', level=2)
-        for obj in objectives.get('specific', []):
-            document.add_paragraph(f"• {obj}", style='List Bullet')
+        self._add_bullet_list(document, objectives.get('specific', []))
     
     def _add_methodology(self, document, methodology: Dict):
         """Adiciona metodologia ao documento"""
@@ -211,230 +412,206 @@ class DocumentGenerator:
         document.add_paragraph(methodology.get('approach', ''))
         
         document.add_heading('Fases do Projeto', level=2)
-        for phase in methodology.get('phases', []):
-            document.add_paragraph(f"• {phase}", style='List Bullet')
+        self._add_bullet_list(document, methodology.get('phases', []))
         
         document.add_heading('Técnicas e Ferramentas', level=2)
-        for technique in methodology.get('techniques', []):
-            document.add_paragraph(f"• {technique}", style='List Bullet')
+        self._add_bullet_list(document, methodology.get('techniques', []))
     
     def _add_timeline(self, document, timeline: List[Dict]):
         """Adiciona cronograma ao documento"""
         if not timeline:
             return
         
-        table = document.add_table(rows=len(timeline)+1, cols=4)
-        table.style = 'Light Grid'
-        
-        # Cabeçalho
-        headers = ['Fase', 'Início', 'Fim', 'Entregas']
-        for i, header in enumerate(headers):
-            cell = table.cell(0, i)
-            cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
-        
-        # Dados
-        for i, phase in enumerate(timeline):
-            table.cell(i+1, 0).text = phase.get('phase', '')
-            table.cell(i+1, 1).text = f"Mês {phase.get('start_month', '')}"
-            table.cell(i+1, 2).text = f"Mês {phase.get('end_month', '')}"
-            table.cell(i+1, 3).text = ', '.join(phase.get('deliverables', []))
+        rows = [
+            (
+                phase.get('phase', ''),
+                f"Mês {phase.get('start_month', '')}",
+                f"Mês {phase.get('end_month', '')}",
+                ', '.join(phase.get('deliverables', []))
+            )
+            for phase in timeline
+        ]
+        self._add_table(document, rows, headers=['Fase', 'Início', 'Fim', 'Entregas'])
     
     def _add_budget(self, document, budget: Dict):
         """Adiciona orçamento ao documento"""
-        document.add_heading('Resumo Orçamentário', level=2)
-        
         total = budget.get('total', 0)
-        document.add_paragraph(f"Valor Total do Projeto: R$ {total:,.2f}")
-        
-        document.add_heading('Distribuição por Categoria', level=2)
-        
-        if budget.get('distribution'):
-            table = document.add_table(rows=len(budget['distribution'])+1, cols=2)
-            table.style = 'Light Grid'
-            
-            table.cell(0, 0).text = 'Categoria'
-            table.cell(0, 1).text = 'Valor (R$)'
-            
-            for i, (category, value) in enumerate(budget['distribution'].items()):
-                table.cell(i+1, 0).text = category.replace('_', ' ').title()
-                table.cell(i+1, 1).text = f"{value:,.2f}"
+        if total:
+            document.add_heading('Resumo Orçamentário', level=2)
+            document.add_paragraph(f"Valor Total do Projeto: R$ {total:,.2f}")
+        
+        # Sem valores distribuídos não há tabela a montar
+        distribution = budget.get('distribution') or {}
+        if any(distribution.values()):
+            document.add_heading('Distribuição por Categoria', level=2)
+            rows = [
+                (_pretty_category(category), f"{value:,.2f}")
+                for category, value in distribution.items()
+            ]
+            self._add_table(document, [('Categoria', 'Valor (R$)')] + rows)
     
     def _add_expected_results(self, document, results: List[str]):
         """Adiciona resultados esperados"""
-        for result in results:
-            document.add_paragraph(f"• {result}", style='List Bullet')
+        self._add_bullet_list(document, results)
     
     def _add_team(self, document, team: List[Dict]):
         """Adiciona equipe ao documento"""
         if not team:
             return
         
-        table = document.add_table(rows=len(team)+1, cols=4)
-        table.style = 'Light Grid'
-        
-        headers = ['Função', 'Quantidade', 'Horas/Semana', 'Qualificação']
-        for i, header in enumerate(headers):
-            cell = table.cell(0, i)
-            cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
-        
-        for i, member in enumerate(team):
-            table.cell(i+1, 0).text = member.get('role', '')
-            table.cell(i+1, 1).text = str(member.get('quantity', ''))
-            table.cell(i+1, 2).text = str(member.get('hours_per_week', ''))
-            table.cell(i+1, 3).text = member.get('qualifications', '')
+        rows = [
+            (
+                member.get('role', ''),
+                member.get('quantity', ''),
+                member.get('hours_per_week', ''),
+                member.get('qualifications', '')
+            )
+            for member in team
+        ]
+        self._add_table(
+            document, rows,
+            headers=['Função', 'Quantidade', 'Horas/Semana', 'Qualificação']
+        )
     
     def _add_metrics(self, document, metrics: List[Dict]):
         """Adiciona métricas de avaliação"""
         if not metrics:
             return
         
-        table = document.add_table(rows=len(metrics)+1, cols=4)
-        table.style = 'Light Grid'
-        
-        headers = ['Indicador', 'Meta', 'Forma de Medição', 'Frequência']
-        for i, header in enumerate(headers):
-            cell = table.cell(0, i)
-            cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
-        
-        for i, metric in enumerate(metrics):
-            table.cell(i+1, 0).text = metric.get('indicator', '')
-            table.cell(i+1, 1).text = str(metric.get('target', ''))
-            table.cell(i+1, 2).text = metric.get('measurement', '')
-            table.cell(i+1, 3).text = metric.get('frequency', '')
+        rows = [
+            (
+                metric.get('indicator', ''),
+                metric.get('target', ''),
+                metric.get('measurement', ''),
+                metric.get('frequency', '')
+            )
+            for metric in metrics
+        ]
+        self._add_table(
+            document, rows,
+            headers=['Indicador', 'Meta', 'Forma de Medição', 'Frequência']
+        )
     
     def _add_sustainability(self, document, sustainability: Dict):
         """Adiciona plano de sustentabilidade"""
         for category, items in sustainability.items():
-            document.add_heading(category.replace('_', ' ').title(), level=2)
-            for item in items:
-                document.add_paragraph(f"• {item}", style='List Bullet')
+            document.add_heading(_pretty_category(category), level=2)
+            self._add_bullet_list(document, items)
     
     def _add_risks(self, document, risks: List[Dict]):
         """Adiciona análise de riscos"""
         if not risks:
             return
         
-        table = document.add_table(rows=len(risks)+1, cols=4)
-        table.style = 'Light Grid'
-        
-        headers = ['Risco', 'Probabilidade', 'Impacto', 'Mitigação']
-        for i, header in enumerate(headers):
-            cell = table.cell(0, i)
-            cell.text = header
-            cell.paragraphs[0].runs[0].font.bold = True
-        
-        for i, risk in enumerate(risks):
-            table.cell(i+1, 0).text = risk.get('risk', '')
-            table.cell(i+1, 1).text = risk.get('probability', '')
-            table.cell(i+1, 2).text = risk.get('impact', '')
-            table.cell(i+1, 3).text = risk.get('mitigation', '')
+        rows = [
+            (
+                risk.get('risk', ''),
+                risk.get('probability', ''),
+                risk.get('impact', ''),
+                risk.get('mitigation', '')
+            )
+            for risk in risks
+        ]
+        self._add_table(
+            document, rows,
+            headers=['Risco', 'Probabilidade', 'Impacto', 'Mitigação']
+        )
     
     async def generate_proposal_pdf(self, project_data: Dict) -> str:
         """Gera proposta em formato PDF"""
+        return await self._run_builder(_build_proposal_pdf, project_data)
+    
+    def _render_proposal_pdf(self, project_data: Dict) -> io.BytesIO:
+        """Monta a proposta PDF (CPU-bound, executado no pool de processos)"""
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
         story = []
         
-        # Estilos
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#003366'),
-            spaceAfter=30,
-            alignment=1  # Center
-        )
-        
         # Título
-        story.append(Paragraph(project_data.get('title', 'PROJETO PRONAS/PCD'), title_style))
+        story.append(Paragraph(project_data.get('title', 'PROJETO PRONAS/PCD'), self.title_style))
         story.append(Spacer(1, 0.5*inch))
         
         # Conteúdo
-        for section in ['justification', 'objectives', 'methodology']:
+        for section in PDF_TEXT_SECTIONS:
             if section in project_data:
-                story.append(Paragraph(section.upper(), styles['Heading1']))
+                story.append(Paragraph(section.upper(), self.styles['Heading1']))
                 
-                if isinstance(project_data[section], dict):
-                    for key, value in project_data[section].items():
-                        story.append(Paragraph(str(value), styles['BodyText']))
-                else:
-                    story.append(Paragraph(str(project_data[section]), styles['BodyText']))
+                # Um único Paragraph por seção: o texto é escapado (nada para
+                # o parser de marcação do ReportLab) e os itens separados por <br/>
+                content = project_data[section]
+                values = content.values() if isinstance(content, dict) else (content,)
+                body = '<br/>'.join(escape(str(value)) for value in values)
+                story.append(Paragraph(body, self.styles['BodyText']))
                 
                 story.append(Spacer(1, 0.2*inch))
         
         # Gerar PDF
         doc.build(story)
-        buffer.seek(0)
         
-        return base64.b64encode(buffer.read()).decode('utf-8')
+        return buffer
     
     async def generate_budget_excel(self, project_data: Dict) -> str:
         """Gera planilha de orçamento em Excel"""
-        import openpyxl
-        from openpyxl.styles import Font, Alignment, PatternFill
+        return await self._run_builder(_build_budget_excel, project_data)
+    
+    def _render_budget_excel(self, project_data: Dict) -> io.BytesIO:
+        """Monta a planilha de orçamento (CPU-bound, executado no pool de processos)"""
+        # constant_memory grava cada linha assim que a próxima começa,
+        # então as linhas precisam ser escritas em ordem
+        buffer = io.BytesIO()
+        wb = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+        ws = wb.add_worksheet("Orçamento")
         
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Orçamento"
+        title_format = wb.add_format(_XLSX_TITLE_FORMAT)
+        header_format = wb.add_format(_XLSX_HEADER_FORMAT)
+        bold_format = wb.add_format(_XLSX_BOLD_FORMAT)
         
         # Cabeçalho
-        ws['A1'] = 'ORÇAMENTO DO PROJETO'
-        ws['A1'].font = Font(bold=True, size=14)
-        ws.merge_cells('A1:E1')
+        ws.merge_range(0, 0, 0, 4, 'ORÇAMENTO DO PROJETO', title_format)
         
-        ws['A3'] = 'Categoria'
-        ws['B3'] = 'Item'
-        ws['C3'] = 'Quantidade'
-        ws['D3'] = 'Valor Unitário'
-        ws['E3'] = 'Valor Total'
+        headers = ['Categoria', 'Item', 'Quantidade', 'Valor Unitário', 'Valor Total']
+        ws.write_row(2, 0, headers, header_format)
         
-        # Estilo do cabeçalho
-        for cell in ws[3]:
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+        # Largura máxima de cada coluna, acompanhada durante a escrita
+        max_widths = [len(header) for header in headers]
+        max_widths[0] = max(max_widths[0], len('ORÇAMENTO DO PROJETO'))
         
         # Dados do orçamento
         budget = project_data.get('budget', {})
-        row = 4
+        row = 3
         
         for category, items in budget.get('items', {}).items():
             for item in items:
-                ws[f'A{row}'] = category.replace('_', ' ').title()
-                ws[f'B{row}'] = item.get('description', '')
-                ws[f'C{row}'] = 1  # Quantidade padrão
-                ws[f'D{row}'] = item.get('value', 0)
-                ws[f'E{row}'] = f"=C{row}*D{row}"
+                values = (
+                    _pretty_category(category),
+                    item.get('description', ''),
+                    1,  # Quantidade padrão
+                    item.get('value', 0)
+                )
+                ws.write_row(row, 0, values)
+                
+                # Linhas do Excel começam em 1
+                formula = f"=C{row+1}*D{row+1}"
+                ws.write_formula(row, 4, formula)
+                
+                for col, value in enumerate(values + (formula,)):
+                    max_widths[col] = max(max_widths[col], len(str(value)))
                 row += 1
         
         # Total
-        ws[f'A{row+1}'] = 'TOTAL'
-        ws[f'A{row+1}'].font = Font(bold=True)
-        ws[f'E{row+1}'] = f"=SUM(E4:E{row-1})"
-        ws[f'E{row+1}'].font = Font(bold=True)
+        total_formula = f"=SUM(E4:E{row})"
+        ws.write(row + 1, 0, 'TOTAL', bold_format)
+        ws.write_formula(row + 1, 4, total_formula, bold_format)
+        max_widths[4] = max(max_widths[4], len(total_formula))
         
         # Ajustar largura das colunas
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            ws.column_dimensions[column_letter].width = adjusted_width
+        for i, width in enumerate(max_widths):
+            ws.set_column(i, i, (width + 2) * 1.2)
         
         # Salvar
-        buffer = io.BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        wb.close()
         
-        return base64.b64encode(buffer.read()).decode('utf-8')
+        return buffer
     
     async def generate_workplan_pdf(self, project_data: Dict) -> str:
         """Gera plano de trabalho em PDF"""
@@ -1,62 +1,275 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
-from typing import Dict, Any
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.background import BackgroundTask
+from starlette.routing import Route
+from prometheus_client import (
+    CollectorRegistry, Histogram, REGISTRY, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+)
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Tuple
+import aiofiles.os
+import aiofiles.tempfile
+import asyncio
+import hashlib
+import logging
+import orjson
+import os
+import time
 
-from .ocr_processor import OCRProcessor
+from .ocr_processor import OCRProcessor, shutdown_ocr_pool
 from .bias_detector import BiasDetector
-from .document_generator import DocumentGenerator
-from .ml_models import ProjectPredictor
-from .nlp_engine import NLPEngine
+from .document_generator import DocumentGenerator, shutdown_document_pool
+from .ml_models import ProjectPredictor, shutdown_retrain_pool
+from .nlp_engine import NLPEngine, preload_models
+from .cache import ResultCache, cache_key, OCR_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos usados ao gravar uploads em disco
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Tamanho máximo aceito para uploads
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+
+# Diretório dos uploads temporários; apontar para um tmpfs (ex.: /dev/shm)
+# elimina o I/O de disco, desde que comporte MAX_UPLOAD_BYTES por requisição
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+
+# Limite de documentos em OCR simultâneo, para não saturar as CPUs
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", os.cpu_count() or 1))
+ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+
+ANALYSIS_SECONDS = Histogram(
+    "ai_document_analysis_seconds", "Duração da análise de documentos", ["use_ai"]
+)
+_ANALYSIS_SECONDS_AI = ANALYSIS_SECONDS.labels("true")
+_ANALYSIS_SECONDS_TEXT_ONLY = ANALYSIS_SECONDS.labels("false")
+
+# Com o gunicorn --preload, o módulo é importado no processo mestre: carregar
+# os modelos aqui faz os workers compartilharem os pesos (copy-on-write)
+if os.getenv("PRELOAD_MODELS") == "1":
+    preload_models()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Cria os componentes uma única vez, na inicialização do serviço"""
+    app.state.cache = ResultCache()
+    app.state.ocr = OCRProcessor(cache=app.state.cache)
+    app.state.bias = BiasDetector()
+    app.state.doc_generator = DocumentGenerator()
+    app.state.ml_predictor = ProjectPredictor()
+    app.state.nlp = NLPEngine(cache=app.state.cache)
+    await app.state.nlp.load_models()
+    
+    yield
+    
+    await app.state.nlp.cleanup()
+    await app.state.ocr.cleanup()
+    await app.state.ml_predictor.close()
+    shutdown_ocr_pool()
+    shutdown_document_pool()
+    shutdown_retrain_pool()
+    await app.state.cache.close()
 
 app = FastAPI(
     title="Serviço de IA - PRONAS/PCD",
     description="Serviço para OCR, análise de texto, detecção de viés e geração de documentos.",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Erros inesperados: registrados no log, sem detalhes internos na resposta
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Erro não tratado em {request.url.path}", exc_info=exc)
+    return ORJSONResponse(status_code=500, content={"detail": "Erro interno do servidor."})
+
+class StreamingAwareGZipMiddleware(GZipMiddleware):
+    """GZip que deixa de fora as rotas de streaming
+
+    O compressor só libera os dados no fim da resposta: as linhas NDJSON
+    chegariam todas de uma vez ao cliente.
+    """
+
+    def __init__(self, app, excluded_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Respostas grandes (documentos em base64, análises) são comprimidas
+app.add_middleware(
+    StreamingAwareGZipMiddleware,
+    excluded_paths=("/analyze-document/stream",),
+    minimum_size=1024,
+    compresslevel=5
 )
 
 # Injeção de Dependências (melhor para testes e manutenção)
-def get_ocr_processor():
-    return OCRProcessor()
+def get_ocr_processor(request: Request) -> OCRProcessor:
+    return request.app.state.ocr
 
-def get_bias_detector():
-    return BiasDetector()
+def get_bias_detector(request: Request) -> BiasDetector:
+    return request.app.state.bias
 
-def get_doc_generator():
-    return DocumentGenerator()
+def get_doc_generator(request: Request) -> DocumentGenerator:
+    return request.app.state.doc_generator
 
-def get_ml_predictor():
-    return ProjectPredictor()
+def get_ml_predictor(request: Request) -> ProjectPredictor:
+    return request.app.state.ml_predictor
+
+def get_nlp_engine(request: Request) -> NLPEngine:
+    return request.app.state.nlp
+
+def get_cache(request: Request) -> ResultCache:
+    return request.app.state.cache
+
+async def save_upload_to_tempfile(file: UploadFile, suffix: str) -> Tuple[str, str]:
+    """Grava o upload em um arquivo temporário, em blocos
+
+    Retorna o caminho e o sha256 do conteúdo, calculado durante a escrita.
+    """
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido.")
+    
+    digest = hashlib.sha256()
+    size = 0
+    # Escrita assíncrona: o event loop segue atendendo enquanto o disco grava
+    async with aiofiles.tempfile.NamedTemporaryFile(
+        "wb", suffix=suffix, delete=False, dir=UPLOAD_TMP_DIR
+    ) as tmp:
+        try:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(status_code=413, detail="Arquivo excede o tamanho máximo permitido.")
+                digest.update(chunk)
+                await tmp.write(chunk)
+        except BaseException:
+            await aiofiles.os.remove(tmp.name)
+            raise
+    return tmp.name, digest.hexdigest()
 
-def get_nlp_engine():
-    return NLPEngine()
+async def extract_pdf_text(ocr: OCRProcessor, pdf_path: str) -> str:
+    """Extrai o texto do PDF respeitando o limite de OCR simultâneo"""
+    async with ocr_semaphore:
+        return await ocr.extract_text_from_pdf_path(pdf_path)
 
 @app.post("/analyze-document", summary="Analisa um documento PDF")
 async def analyze_document(
     file: UploadFile = File(...),
+    use_ai: bool = True,
     ocr: OCRProcessor = Depends(get_ocr_processor),
     nlp: NLPEngine = Depends(get_nlp_engine),
-    bias: BiasDetector = Depends(get_bias_detector)
+    bias: BiasDetector = Depends(get_bias_detector),
+    cache: ResultCache = Depends(get_cache)
 ):
     """
     Recebe um documento PDF, extrai o texto com OCR, e realiza uma análise preliminar
-    de viés e conformidade.
+    de viés e conformidade. Com use_ai=false, apenas extrai o texto.
     """
-    if not file.filename.lower().endswith(".pdf"):
+    # Nunca usar o nome enviado pelo cliente como caminho
+    filename = os.path.basename(file.filename or "")
+    if not filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas PDF é aceito.")
 
-    contents = await file.read()
-    extracted_text = await ocr.extract_text_from_pdf_bytes(contents)
+    # Relógio monotônico: imune a ajustes do relógio de parede
+    started = time.monotonic_ns()
+    pdf_path, content_hash = await save_upload_to_tempfile(file, suffix=".pdf")
+    try:
+        extracted_text = await ocr_uploaded_pdf(ocr, cache, pdf_path, content_hash)
+    finally:
+        # O arquivo só é necessário para o OCR; remoção fora do event loop
+        await aiofiles.os.remove(pdf_path)
+    
     if not extracted_text:
         raise HTTPException(status_code=422, detail="Não foi possível extrair texto do documento.")
 
-    # Simulação de dados do projeto extraídos do texto
-    project_data_simulation = {"text": extracted_text, "region": "sudeste"}
-    bias_analysis = await bias.analyze(project_data_simulation)
-
-    return {
-        "filename": file.filename,
+    result = {
+        "filename": filename,
         "extracted_text_snippet": extracted_text[:1000] + "...",
-        "bias_analysis": bias_analysis,
     }
+    
+    # Caminho rápido: só a extração de texto, sem a análise de viés
+    if not use_ai:
+        _ANALYSIS_SECONDS_TEXT_ONLY.observe((time.monotonic_ns() - started) / 1e9)
+        return ORJSONResponse(result)
+
+    result["bias_analysis"] = await run_bias_analysis(bias, extracted_text)
+    _ANALYSIS_SECONDS_AI.observe((time.monotonic_ns() - started) / 1e9)
+
+    # Resposta direta: o orjson serializa em C (inclusive datetime e numpy),
+    # sem a passada recursiva do jsonable_encoder do FastAPI
+    return ORJSONResponse(result)
+
+@app.post("/analyze-document/stream", summary="Analisa um documento PDF (NDJSON)")
+async def analyze_document_stream(
+    file: UploadFile = File(...),
+    ocr: OCRProcessor = Depends(get_ocr_processor),
+    bias: BiasDetector = Depends(get_bias_detector),
+    cache: ResultCache = Depends(get_cache)
+):
+    """
+    Variante em streaming de /analyze-document: cada etapa é enviada como uma
+    linha NDJSON assim que termina ({"stage": "ocr", ...}, {"stage": "bias", ...},
+    {"stage": "done"}).
+    """
+    filename = os.path.basename(file.filename or "")
+    if not filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Formato de arquivo inválido. Apenas PDF é aceito.")
+
+    # O upload precisa ser gravado antes da resposta começar: o FastAPI fecha
+    # o UploadFile quando o handler retorna
+    pdf_path, content_hash = await save_upload_to_tempfile(file, suffix=".pdf")
+
+    async def stages():
+        extracted_text = await ocr_uploaded_pdf(ocr, cache, pdf_path, content_hash)
+        if not extracted_text:
+            yield orjson.dumps({
+                "stage": "error",
+                "detail": "Não foi possível extrair texto do documento."
+            }) + b"\n"
+            return
+        
+        yield orjson.dumps({
+            "stage": "ocr",
+            "filename": filename,
+            "extracted_text_snippet": extracted_text[:1000] + "...",
+        }) + b"\n"
+        
+        bias_analysis = await run_bias_analysis(bias, extracted_text)
+        yield orjson.dumps({"stage": "bias", "bias_analysis": bias_analysis}) + b"\n"
+        yield orjson.dumps({"stage": "done"}) + b"\n"
+
+    # Remoção do upload ao fim da resposta, mesmo que o cliente desconecte
+    # antes de o gerador começar
+    return StreamingResponse(
+        stages(),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(aiofiles.os.remove, pdf_path)
+    )
+
+async def ocr_uploaded_pdf(
+    ocr: OCRProcessor, cache: ResultCache, pdf_path: str, content_hash: str
+) -> str:
+    """Extrai o texto de um upload salvo em disco (removido pelo chamador)"""
+    # O mesmo PDF enviado de novo reaproveita o texto já extraído
+    return await cache.get_or_compute(
+        "ocr", cache_key("upload", content_hash), OCR_CACHE_TTL,
+        lambda: extract_pdf_text(ocr, pdf_path)
+    )
+
+async def run_bias_analysis(bias: BiasDetector, extracted_text: str) -> Dict[str, Any]:
+    """Análise de viés sobre o texto extraído"""
+    # Simulação de dados do projeto extraídos do texto
+    project_data_simulation = {"text": extracted_text, "region": "sudeste"}
+    return await bias.analyze(project_data_simulation)
 
 @app.post("/generate-documents", summary="Gera documentos de projeto")
 async def generate_documents(
@@ -67,10 +280,34 @@ async def generate_documents(
     Gera documentos como proposta e orçamento com base nos dados do projeto.
     """
     generated_files = await doc_gen.generate_documents(project_data, ["proposal_docx", "budget_xlsx"])
-    return {"message": "Documentos gerados com sucesso", "files": generated_files}
+    return ORJSONResponse({"message": "Documentos gerados com sucesso", "files": generated_files})
 
 
-@app.get("/health", summary="Verifica a saúde do serviço")
-def health_check():
+# Health check e métricas são consultados com frequência: rotas Starlette
+# puras, sem injeção de dependências nem modelo de resposta do FastAPI
+async def health_check(request: Request):
     """Endpoint de health check."""
-    return {"status": "ok"}
\ No newline at end of file
+    return ORJSONResponse({"status": "ok"})
+
+def _metrics_registry() -> CollectorRegistry:
+    """Registro a expor: agrega todos os workers em modo multiprocesso"""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+# Cache da última exposição de métricas, para agrupar coletas em rajada
+METRICS_CACHE_SECONDS = 1.0
+_metrics_cache: Tuple[float, bytes] = (0.0, b"")
+
+async def metrics(request: Request):
+    """Exposição das métricas no formato do Prometheus."""
+    global _metrics_cache
+    now = time.monotonic()
+    if now - _metrics_cache[0] > METRICS_CACHE_SECONDS:
+        _metrics_cache = (now, generate_latest(_metrics_registry()))
+    return Response(content=_metrics_cache[1], media_type=CONTENT_TYPE_LATEST)
+
+app.router.routes.append(Route("/health", endpoint=health_check, methods=["GET"]))
+app.router.routes.append(Route("/metrics", endpoint=metrics, methods=["GET"]))
\ No newline at end of file
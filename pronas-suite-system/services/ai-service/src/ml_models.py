@@ -1,43 +1,340 @@
 import torch
 import torch.nn as nn
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 import xgboost as xgb
+import hummingbird.ml
+import treelite
+import treelite_runtime
 from typing import Dict, List, Optional, Tuple
-import pickle
+import joblib
+from types import MappingProxyType
 import asyncio
+import fcntl
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
 from datetime import datetime
 import logging
 
+from .batching import BatchAnalyzer, PRONAS_MAX_BATCH, PRONAS_MAX_WAIT_MS
+
 logger = logging.getLogger(__name__)
 
+# Codificação do tipo de projeto usada nas features dos modelos
+PROJECT_TYPE_ENCODING = MappingProxyType({'research': 0, 'development': 1, 'training': 2})
+
+# Uma linha por predição: histograma na CPU e uma thread por modelo, sem
+# disputar threads entre requisições concorrentes e workers do gunicorn
+XGB_REGRESSOR_PARAMS = MappingProxyType({
+    'n_estimators': 100,
+    'tree_method': 'hist',
+    'device': 'cpu',
+    'n_jobs': 1,
+    'random_state': 42
+})
+
+# Tamanho do vetor de features (ver _extract_features)
+NUM_FEATURES = 6
+
+# Campos considerados na completude do score de qualidade
+QUALITY_REQUIRED_FIELDS = (
+    'title', 'justification', 'objectives', 'methodology',
+    'budget', 'timeline', 'expected_results'
+)
+# Coerência (simplified): placeholder para análise mais complexa
+COHERENCE_PLACEHOLDER = 0.85
+
+# Ensembles de árvores compilados para operações tensoriais (Hummingbird)
+COMPILED_MODEL_SUFFIX = '.hb.zip'
+
+# Regressores XGBoost compilados para biblioteca nativa (Treelite)
+NATIVE_MODEL_SUFFIX = '.so'
+
+
+def _freeze(value):
+    """Converte dicts/listas aninhados em MappingProxyType/tuplas"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Cópia mutável (dicts/listas) de uma estrutura congelada por _freeze"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+# Conteúdo fixo das seções: montado uma vez, não a cada projeto gerado.
+# Congelado (imutável); cada projeto recebe a sua cópia via _thaw, então
+# alterar uma resposta não afeta as seguintes
+METHODOLOGIES = _freeze({
+    "research": {
+        "approach": "Pesquisa aplicada com abordagem quali-quantitativa",
+        "phases": [
+            "Revisão sistemática da literatura",
+            "Definição de protocolo de pesquisa",
+            "Coleta de dados primários e secundários",
+            "Análise estatística e interpretação",
+            "Validação dos resultados",
+            "Disseminação do conhecimento"
+        ],
+        "techniques": [
+            "Análise bibliométrica",
+            "Surveys estruturados",
+            "Entrevistas semi-estruturadas",
+            "Análise de conteúdo",
+            "Modelagem estatística"
+        ]
+    },
+    "development": {
+        "approach": "Desenvolvimento iterativo e incremental",
+        "phases": [
+            "Análise de requisitos",
+            "Design e prototipação",
+            "Desenvolvimento e implementação",
+            "Testes e validação",
+            "Implantação piloto",
+            "Avaliação e ajustes"
+        ],
+        "techniques": [
+            "Design thinking",
+            "Prototipação rápida",
+            "Testes de usabilidade",
+            "Metodologia ágil",
+            "Validação com usuários"
+        ]
+    },
+    "training": {
+        "approach": "Formação teórico-prática com metodologias ativas",
+        "phases": [
+            "Diagnóstico de necessidades",
+            "Desenvolvimento curricular",
+            "Produção de material didático",
+            "Execução dos módulos",
+            "Avaliação de aprendizagem",
+            "Certificação e acompanhamento"
+        ],
+        "techniques": [
+            "Aprendizagem baseada em problemas",
+            "Estudos de caso",
+            "Simulações práticas",
+            "Mentoria e coaching",
+            "Avaliação por competências"
+        ]
+    }
+})
+
+DEFAULT_TEAM = _freeze([
+    {
+        "role": "Coordenador Geral",
+        "quantity": 1,
+        "hours_per_week": 20,
+        "qualifications": "Doutorado na área, experiência em gestão de projetos"
+    },
+    {
+        "role": "Pesquisador Senior",
+        "quantity": 2,
+        "hours_per_week": 30,
+        "qualifications": "Mestrado na área, publicações relevantes"
+    },
+    {
+        "role": "Pesquisador Junior",
+        "quantity": 3,
+        "hours_per_week": 40,
+        "qualifications": "Graduação na área, experiência em pesquisa"
+    },
+    {
+        "role": "Assistente de Pesquisa",
+        "quantity": 2,
+        "hours_per_week": 20,
+        "qualifications": "Estudante de graduação ou pós-graduação"
+    },
+    {
+        "role": "Especialista em Acessibilidade",
+        "quantity": 1,
+        "hours_per_week": 15,
+        "qualifications": "Certificação em acessibilidade, experiência prática"
+    }
+])
+
+DEFAULT_RESOURCES = _freeze({
+    "infrastructure": [
+        "Espaço físico adequado e acessível",
+        "Laboratório equipado",
+        "Sala de reuniões",
+        "Ambiente de testes"
+    ],
+    "technology": [
+        "Computadores e notebooks",
+        "Software especializado",
+        "Plataforma de gestão de projetos",
+        "Ferramentas de análise de dados"
+    ],
+    "partnerships": [
+        "Instituições de ensino",
+        "Organizações de pessoas com deficiência",
+        "Órgãos governamentais",
+        "Empresas parceiras"
+    ]
+})
+
+DEFAULT_RISKS = _freeze([
+    {
+        "risk": "Dificuldade de recrutamento de participantes",
+        "probability": "Média",
+        "impact": "Alto",
+        "mitigation": "Parcerias com organizações e divulgação ampla"
+    },
+    {
+        "risk": "Atrasos no cronograma",
+        "probability": "Média",
+        "impact": "Médio",
+        "mitigation": "Planejamento com margens de segurança e monitoramento contínuo"
+    },
+    {
+        "risk": "Limitações orçamentárias",
+        "probability": "Baixa",
+        "impact": "Alto",
+        "mitigation": "Gestão financeira rigorosa e busca de recursos complementares"
+    },
+    {
+        "risk": "Resistência à mudança",
+        "probability": "Média",
+        "impact": "Médio",
+        "mitigation": "Programa de sensibilização e capacitação gradual"
+    },
+    {
+        "risk": "Questões éticas e regulatórias",
+        "probability": "Baixa",
+        "impact": "Alto",
+        "mitigation": "Aprovação em comitê de ética e compliance regulatório"
+    }
+])
+
+SUSTAINABILITY_PLAN = _freeze({
+    "financial": [
+        "Busca de financiamento continuado",
+        "Parcerias público-privadas",
+        "Geração de receita própria",
+        "Captação de recursos via editais"
+    ],
+    "institutional": [
+        "Integração com políticas públicas",
+        "Institucionalização das práticas",
+        "Formação de rede de apoio",
+        "Documentação e transferência de conhecimento"
+    ],
+    "social": [
+        "Engajamento da comunidade",
+        "Formação de multiplicadores",
+        "Advocacy e conscientização",
+        "Empoderamento dos beneficiários"
+    ]
+})
+
+# Duração (meses) e fases do cronograma; entregáveis montados uma única vez
+PROJECT_DURATION_MONTHS = MappingProxyType({
+    "research": 24,
+    "development": 18,
+    "training": 12
+})
+
+PHASE_NAMES = (
+    "Planejamento e Preparação",
+    "Execução - Fase 1",
+    "Execução - Fase 2",
+    "Validação e Testes",
+    "Implementação Final",
+    "Avaliação e Encerramento"
+)
+
+PHASE_DELIVERABLES = tuple(
+    (f"Relatório de {name}", f"Indicadores de {name}", f"Documentação de {name}")
+    for name in PHASE_NAMES
+)
+
+SIMULATE_RETRAIN = os.getenv("PRONAS_SIMULATE_RETRAIN") == "1"
+
+_retrain_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_retrain_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de retraining, criando-o no primeiro uso"""
+    global _retrain_pool
+    if _retrain_pool is None:
+        _retrain_pool = ProcessPoolExecutor(max_workers=1)
+    return _retrain_pool
+
+
+def shutdown_retrain_pool():
+    """Encerra o pool de processos de retraining, se tiver sido criado"""
+    global _retrain_pool
+    if _retrain_pool is not None:
+        _retrain_pool.shutdown(cancel_futures=True)
+        _retrain_pool = None
+
+
+def _retrain_sync(feedback_data: List[Dict]):
+    """Retraining síncrono, executado no pool de processos"""
+    # 2. Preparar dataset de treino
+    # 3. Retreinar modelos
+    # 4. Validar performance
+    # 5. Deploy se melhor que modelo atual
+    logger.info(f"Retraining com {len(feedback_data)} feedbacks")
+
+
+def _is_up_to_date(compiled_path: str, model_path: str) -> bool:
+    """O artefato compilado existe e não é mais antigo que o .pkl de origem"""
+    try:
+        compiled_mtime = os.path.getmtime(compiled_path)
+    except FileNotFoundError:
+        return False
+    try:
+        return compiled_mtime >= os.path.getmtime(model_path)
+    except FileNotFoundError:
+        # Só o artefato compilado foi implantado
+        return True
+
+
+class TreeliteRegressor:
+    """Regressor compilado pelo Treelite, com a mesma interface de predict"""
+    
+    def __init__(self, libpath: str):
+        self.predictor = treelite_runtime.Predictor(libpath, nthread=1)
+    
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        return self.predictor.predict(treelite_runtime.DMatrix(features))
+
 class ProjectPredictor:
     def __init__(self):
         self.approval_model = None
         self.quality_model = None
         self.timeline_model = None
         self.budget_model = None
-        self.tokenizer = None
-        self.bert_model = None
         self.models_loaded = False
         
-    async def load_models(self):
+        # Requisições concorrentes de predição viram uma única chamada ao modelo
+        self.approval_batcher = BatchAnalyzer(
+            self._predict_approval_batch,
+            max_batch=PRONAS_MAX_BATCH,
+            max_wait_ms=PRONAS_MAX_WAIT_MS,
+            name="approval"
+        )
+        
+    async def load_classical_models(self):
         """Carrega modelos treinados"""
         try:
-            # Carregar BERT para análise de texto
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                'neuralmind/bert-base-portuguese-cased'
-            )
-            self.bert_model = AutoModelForSequenceClassification.from_pretrained(
-                'neuralmind/bert-base-portuguese-cased',
-                num_labels=2
-            )
-            
             # Carregar modelos de ML
             self.approval_model = await self._load_or_create_model(
                 'approval_model.pkl',
-                RandomForestClassifier(n_estimators=100, random_state=42)
+                RandomForestClassifier(n_estimators=100, n_jobs=1, random_state=42)
             )
             
             self.quality_model = await self._load_or_create_model(
@@ -47,12 +344,12 @@ class ProjectPredictor:
             
             self.timeline_model = await self._load_or_create_model(
                 'timeline_model.pkl',
-                xgb.XGBRegressor(n_estimators=100, random_state=42)
+                xgb.XGBRegressor(**XGB_REGRESSOR_PARAMS)
             )
             
             self.budget_model = await self._load_or_create_model(
                 'budget_model.pkl',
-                xgb.XGBRegressor(n_estimators=100, random_state=42)
+                xgb.XGBRegressor(**XGB_REGRESSOR_PARAMS)
             )
             
             self.models_loaded = True
@@ -63,13 +360,69 @@ class ProjectPredictor:
             raise
     
     async def _load_or_create_model(self, filename: str, default_model):
-        """Carrega modelo salvo ou cria novo"""
-        try:
-            with open(f'/models/{filename}', 'rb') as f:
-                return pickle.load(f)
-        except FileNotFoundError:
+        """Carrega modelo salvo (compilado, se houver) ou cria novo"""
+        # XGBoost vira biblioteca nativa; os demais ensembles, tensores PyTorch
+        if isinstance(default_model, xgb.XGBRegressor):
+            suffix, load, compile_ = NATIVE_MODEL_SUFFIX, TreeliteRegressor, self._compile_native_model
+        else:
+            suffix, load, compile_ = COMPILED_MODEL_SUFFIX, self._load_compiled_model, self._compile_model
+        
+        model_path = f'/models/{filename}'
+        compiled_path = model_path.replace('.pkl', suffix)
+        if _is_up_to_date(compiled_path, model_path):
+            return await asyncio.to_thread(load, compiled_path)
+        
+        if not os.path.isfile(model_path):
             logger.info(f"Criando novo modelo: {filename}")
             return default_model
+        
+        # Modelo treinado sem versão compilada atual (nova ou retreinada)
+        return await asyncio.to_thread(
+            self._compile_once, model_path, compiled_path, load, compile_
+        )
+    
+    def _compile_once(self, model_path: str, compiled_path: str, load, compile_):
+        """Compila o modelo sob um lock de arquivo compartilhado pelos workers"""
+        # Só um worker do gunicorn compila; os demais esperam e carregam o
+        # artefato pronto
+        with open(f'{compiled_path}.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if _is_up_to_date(compiled_path, model_path):
+                return load(compiled_path)
+            return compile_(joblib.load(model_path), compiled_path)
+    
+    def _compile_model(self, model, compiled_path: str):
+        """Compila o ensemble de árvores para PyTorch e salva o artefato"""
+        logger.info(f"Compilando modelo: {compiled_path}")
+        compiled = hummingbird.ml.convert(model, "torch")
+        # Gravação num arquivo temporário e troca atômica: nenhum worker lê
+        # um artefato pela metade (o Hummingbird acrescenta o .zip)
+        tmp_path = compiled_path[:-len('.zip')] + f'.{os.getpid()}.tmp.zip'
+        compiled.save(tmp_path)
+        os.replace(tmp_path, compiled_path)
+        return self._to_device(compiled)
+    
+    def _compile_native_model(self, model, compiled_path: str) -> TreeliteRegressor:
+        """Compila o regressor XGBoost para uma biblioteca nativa (.so)"""
+        logger.info(f"Compilando modelo: {compiled_path}")
+        tmp_path = compiled_path[:-len(NATIVE_MODEL_SUFFIX)] + f'.{os.getpid()}.tmp{NATIVE_MODEL_SUFFIX}'
+        treelite.Model.from_xgboost(model.get_booster()).export_lib(
+            toolchain="gcc",
+            libpath=tmp_path,
+            params={"parallel_comp": 8, "quantize": 1}
+        )
+        os.replace(tmp_path, compiled_path)
+        return TreeliteRegressor(compiled_path)
+    
+    def _load_compiled_model(self, compiled_path: str):
+        """Carrega um modelo compilado pelo Hummingbird"""
+        return self._to_device(hummingbird.ml.load(compiled_path))
+    
+    def _to_device(self, compiled):
+        """Move o modelo compilado para a GPU, quando disponível"""
+        if torch.cuda.is_available():
+            compiled.to('cuda')
+        return compiled
     
     async def generate_project_structure(
         self,
@@ -84,31 +437,37 @@ class ProjectPredictor:
         requirements = guidelines.get('requirements', [])
         objectives = guidelines.get('objectives', [])
         
-        # Gerar seções do projeto
+        # Um único relógio para id e data de geração; o id usa o timestamp
+        # lido, sem converter o datetime de volta (mktime) em .timestamp()
+        now_ts = time.time()
+        now = datetime.fromtimestamp(now_ts)
+        
+        # Seções são montadas em memória, sem I/O: chamadas diretas,
+        # sem o custo de uma corrotina por seção
         project_structure = {
-            "id": f"proj_{datetime.now().timestamp()}",
+            "id": f"proj_{now_ts}",
             "institution_id": institution_id,
             "type": project_type,
-            "title": await self._generate_title(initial_data, objectives),
-            "justification": await self._generate_justification(
+            "title": self._generate_title(initial_data, objectives),
+            "justification": self._generate_justification(
                 initial_data, requirements
             ),
-            "objectives": await self._generate_objectives(objectives),
-            "methodology": await self._generate_methodology(
+            "objectives": self._generate_objectives(objectives),
+            "methodology": self._generate_methodology(
                 project_type, requirements
             ),
-            "expected_results": await self._generate_expected_results(
+            "expected_results": self._generate_expected_results(
                 objectives
             ),
-            "budget": await self._generate_budget(project_type, initial_data),
-            "timeline": await self._generate_timeline(project_type),
-            "team": await self._generate_team(project_type),
-            "resources": await self._generate_resources(project_type),
-            "evaluation_metrics": await self._generate_metrics(objectives),
-            "sustainability": await self._generate_sustainability_plan(),
-            "risks": await self._analyze_risks(project_type),
+            "budget": self._generate_budget(project_type, initial_data),
+            "timeline": self._generate_timeline(project_type),
+            "team": self._generate_team(project_type),
+            "resources": self._generate_resources(project_type),
+            "evaluation_metrics": self._generate_metrics(objectives),
+            "sustainability": self._generate_sustainability_plan(),
+            "risks": self._analyze_risks(project_type),
             "confidence": 0.85,
-            "generated_at": datetime.now().isoformat()
+            "generated_at": now
         }
         
         # Calcular score de qualidade
@@ -117,7 +476,7 @@ class ProjectPredictor:
         
         return project_structure
     
-    async def _generate_title(self, data: Dict, objectives: List) -> str:
+    def _generate_title(self, data: Dict, objectives: List) -> str:
         """Gera título do projeto"""
         base_title = data.get('title', '')
         
@@ -128,11 +487,19 @@ class ProjectPredictor:
         
         return base_title or "Projeto PRONAS/PCD"
     
-    async def _generate_justification(
+    def _generate_justification(
         self, data: Dict, requirements: List
     ) -> str:
         """Gera justificativa do projeto"""
-        justification_template = """
+        objetivo_principal = data.get('main_objective', 'desenvolver soluções inovadoras')
+        contexto = data.get('context', 'o cenário atual de inclusão')
+        fundamentacao = data.get('foundation', 'evidências científicas e demandas sociais')
+        requisitos_atendidos = self._format_requirements(requirements)
+        impactos = data.get('impacts', 'melhorias significativas na qualidade de vida')
+        beneficiarios = data.get('beneficiaries', '1000')
+        
+        # f-string: montada em uma única concatenação, sem parse do template
+        justification = f"""
         Este projeto se justifica pela necessidade de {objetivo_principal}, 
         considerando {contexto}. A relevância desta iniciativa está fundamentada 
         em {fundamentacao}, atendendo aos requisitos estabelecidos pelo PRONAS/PCD.
@@ -143,16 +510,6 @@ class ProjectPredictor:
         {beneficiarios} pessoas com deficiência.
         """
         
-        # Preencher template com dados
-        justification = justification_template.format(
-            objetivo_principal=data.get('main_objective', 'desenvolver soluções inovadoras'),
-            contexto=data.get('context', 'o cenário atual de inclusão'),
-            fundamentacao=data.get('foundation', 'evidências científicas e demandas sociais'),
-            requisitos_atendidos=self._format_requirements(requirements),
-            impactos=data.get('impacts', 'melhorias significativas na qualidade de vida'),
-            beneficiarios=data.get('beneficiaries', '1000')
-        )
-        
         return justification.strip()
     
     def _format_requirements(self, requirements: List) -> str:
@@ -160,10 +517,10 @@ class ProjectPredictor:
         if not requirements:
             return ""
         
-        req_texts = [f"- {req.get('text', '')}" for req in requirements[:5]]
-        return "Este projeto atende aos seguintes requisitos:\n" + "\n".join(req_texts)
+        req_texts = "\n".join(f"- {req.get('text', '')}" for req in islice(requirements, 5))
+        return f"Este projeto atende aos seguintes requisitos:\n{req_texts}"
     
-    async def _generate_objectives(self, objectives_data: List) -> Dict:
+    def _generate_objectives(self, objectives_data: List) -> Dict:
         """Gera objetivos do projeto"""
         general_objective = ""
         specific_objectives = []
@@ -190,70 +547,13 @@ class ProjectPredictor:
             "specific": specific_objectives
         }
     
-    async def _generate_methodology(
+    def _generate_methodology(
         self, project_type: str, requirements: List
     ) -> Dict:
         """Gera metodologia do projeto"""
-        methodologies = {
-            "research": {
-                "approach": "Pesquisa aplicada com abordagem quali-quantitativa",
-                "phases": [
-                    "Revisão sistemática da literatura",
-                    "Definição de protocolo de pesquisa",
-                    "Coleta de dados primários e secundários",
-                    "Análise estatística e interpretação",
-                    "Validação dos resultados",
-                    "Disseminação do conhecimento"
-                ],
-                "techniques": [
-                    "Análise bibliométrica",
-                    "Surveys estruturados",
-                    "Entrevistas semi-estruturadas",
-                    "Análise de conteúdo",
-                    "Modelagem estatística"
-                ]
-            },
-            "development": {
-                "approach": "Desenvolvimento iterativo e incremental",
-                "phases": [
-                    "Análise de requisitos",
-                    "Design e prototipação",
-                    "Desenvolvimento e implementação",
-                    "Testes e validação",
-                    "Implantação piloto",
-                    "Avaliação e ajustes"
-                ],
-                "techniques": [
-                    "Design thinking",
-                    "Prototipação rápida",
-                    "Testes de usabilidade",
-                    "Metodologia ágil",
-                    "Validação com usuários"
-                ]
-            },
-            "training": {
-                "approach": "Formação teórico-prática com metodologias ativas",
-                "phases": [
-                    "Diagnóstico de necessidades",
-                    "Desenvolvimento curricular",
-                    "Produção de material didático",
-                    "Execução dos módulos",
-                    "Avaliação de aprendizagem",
-                    "Certificação e acompanhamento"
-                ],
-                "techniques": [
-                    "Aprendizagem baseada em problemas",
-                    "Estudos de caso",
-                    "Simulações práticas",
-                    "Mentoria e coaching",
-                    "Avaliação por competências"
-                ]
-            }
-        }
-        
-        return methodologies.get(project_type, methodologies["development"])
+        return _thaw(METHODOLOGIES.get(project_type, METHODOLOGIES["development"]))
     
-    async def _generate_budget(self, project_type: str, data: Dict) -> Dict:
+    def _generate_budget(self, project_type: str, data: Dict) -> Dict:
         """Gera orçamento do projeto"""
         base_budget = data.get('budget', 500000)
         
@@ -297,103 +597,30 @@ class ProjectPredictor:
             "currency": "BRL"
         }
     
-    async def _generate_timeline(self, project_type: str) -> List[Dict]:
+    def _generate_timeline(self, project_type: str) -> List[Dict]:
         """Gera cronograma do projeto"""
-        timelines = {
-            "research": 24,  # meses
-            "development": 18,
-            "training": 12
-        }
-        
-        duration = timelines.get(project_type, 18)
+        duration = PROJECT_DURATION_MONTHS.get(project_type, 18)
+        phase_duration = duration // len(PHASE_NAMES)
         
-        phases = []
-        phase_duration = duration // 6  # 6 fases principais
-        
-        phase_names = [
-            "Planejamento e Preparação",
-            "Execução - Fase 1",
-            "Execução - Fase 2", 
-            "Validação e Testes",
-            "Implementação Final",
-            "Avaliação e Encerramento"
-        ]
-        
-        for i, name in enumerate(phase_names):
-            phases.append({
+        return [
+            {
                 "phase": name,
                 "start_month": i * phase_duration + 1,
                 "end_month": (i + 1) * phase_duration,
-                "deliverables": [
-                    f"Relatório de {name}",
-                    f"Indicadores de {name}",
-                    f"Documentação de {name}"
-                ]
-            })
-        
-        return phases
-    
-    async def _generate_team(self, project_type: str) -> List[Dict]:
-        """Gera equipe do projeto"""
-        team = [
-            {
-                "role": "Coordenador Geral",
-                "quantity": 1,
-                "hours_per_week": 20,
-                "qualifications": "Doutorado na área, experiência em gestão de projetos"
-            },
-            {
-                "role": "Pesquisador Senior",
-                "quantity": 2,
-                "hours_per_week": 30,
-                "qualifications": "Mestrado na área, publicações relevantes"
-            },
-            {
-                "role": "Pesquisador Junior",
-                "quantity": 3,
-                "hours_per_week": 40,
-                "qualifications": "Graduação na área, experiência em pesquisa"
-            },
-            {
-                "role": "Assistente de Pesquisa",
-                "quantity": 2,
-                "hours_per_week": 20,
-                "qualifications": "Estudante de graduação ou pós-graduação"
-            },
-            {
-                "role": "Especialista em Acessibilidade",
-                "quantity": 1,
-                "hours_per_week": 15,
-                "qualifications": "Certificação em acessibilidade, experiência prática"
+                "deliverables": list(deliverables)
             }
+            for i, (name, deliverables) in enumerate(zip(PHASE_NAMES, PHASE_DELIVERABLES))
         ]
-        
-        return team
     
-    async def _generate_resources(self, project_type: str) -> Dict:
+    def _generate_team(self, project_type: str) -> List[Dict]:
+        """Gera equipe do projeto"""
+        return _thaw(DEFAULT_TEAM)
+    
+    def _generate_resources(self, project_type: str) -> Dict:
         """Gera recursos necessários"""
-        return {
-            "infrastructure": [
-                "Espaço físico adequado e acessível",
-                "Laboratório equipado",
-                "Sala de reuniões",
-                "Ambiente de testes"
-            ],
-            "technology": [
-                "Computadores e notebooks",
-                "Software especializado",
-                "Plataforma de gestão de projetos",
-                "Ferramentas de análise de dados"
-            ],
-            "partnerships": [
-                "Instituições de ensino",
-                "Organizações de pessoas com deficiência",
-                "Órgãos governamentais",
-                "Empresas parceiras"
-            ]
-        }
+        return _thaw(DEFAULT_RESOURCES)
     
-    async def _generate_expected_results(self, objectives: List) -> List[str]:
+    def _generate_expected_results(self, objectives: List) -> List[str]:
         """Gera resultados esperados"""
         results = [
             "Desenvolvimento de solução inovadora validada pelos usuários",
@@ -406,7 +633,7 @@ class ProjectPredictor:
         
         return results
     
-    async def _generate_metrics(self, objectives: List) -> List[Dict]:
+    def _generate_metrics(self, objectives: List) -> List[Dict]:
         """Gera métricas de avaliação"""
         metrics = [
             {
@@ -443,77 +670,18 @@ class ProjectPredictor:
         
         return metrics
     
-    async def _generate_sustainability_plan(self) -> Dict:
+    def _generate_sustainability_plan(self) -> Dict:
         """Gera plano de sustentabilidade"""
-        return {
-            "financial": [
-                "Busca de financiamento continuado",
-                "Parcerias público-privadas",
-                "Geração de receita própria",
-                "Captação de recursos via editais"
-            ],
-            "institutional": [
-                "Integração com políticas públicas",
-                "Institucionalização das práticas",
-                "Formação de rede de apoio",
-                "Documentação e transferência de conhecimento"
-            ],
-            "social": [
-                "Engajamento da comunidade",
-                "Formação de multiplicadores",
-                "Advocacy e conscientização",
-                "Empoderamento dos beneficiários"
-            ]
-        }
+        return _thaw(SUSTAINABILITY_PLAN)
     
-    async def _analyze_risks(self, project_type: str) -> List[Dict]:
+    def _analyze_risks(self, project_type: str) -> List[Dict]:
         """Analisa riscos do projeto"""
-        risks = [
-            {
-                "risk": "Dificuldade de recrutamento de participantes",
-                "probability": "Média",
-                "impact": "Alto",
-                "mitigation": "Parcerias com organizações e divulgação ampla"
-            },
-            {
-                "risk": "Atrasos no cronograma",
-                "probability": "Média",
-                "impact": "Médio",
-                "mitigation": "Planejamento com margens de segurança e monitoramento contínuo"
-            },
-            {
-                "risk": "Limitações orçamentárias",
-                "probability": "Baixa",
-                "impact": "Alto",
-                "mitigation": "Gestão financeira rigorosa e busca de recursos complementares"
-            },
-            {
-                "risk": "Resistência à mudança",
-                "probability": "Média",
-                "impact": "Médio",
-                "mitigation": "Programa de sensibilização e capacitação gradual"
-            },
-            {
-                "risk": "Questões éticas e regulatórias",
-                "probability": "Baixa",
-                "impact": "Alto",
-                "mitigation": "Aprovação em comitê de ética e compliance regulatório"
-            }
-        ]
-        
-        return risks
+        return _thaw(DEFAULT_RISKS)
     
     async def _calculate_quality_score(self, project: Dict) -> float:
         """Calcula score de qualidade do projeto"""
-        scores = []
-        
         # Completude
-        required_fields = [
-            'title', 'justification', 'objectives', 'methodology',
-            'budget', 'timeline', 'expected_results'
-        ]
-        completeness = sum(1 for field in required_fields if project.get(field)) / len(required_fields)
-        scores.append(completeness)
+        completeness = sum(1 for field in QUALITY_REQUIRED_FIELDS if project.get(field)) / len(QUALITY_REQUIRED_FIELDS)
         
         # Detalhamento
         detail_score = 0
@@ -525,12 +693,9 @@ class ProjectPredictor:
             detail_score += 0.25
         if len(project.get('timeline', [])) >= 4:
             detail_score += 0.25
-        scores.append(detail_score)
         
-        # Coerência (simplified)
-        scores.append(0.85)  # Placeholder para análise mais complexa
-        
-        return np.mean(scores)
+        # Média de completude, detalhamento e coerência, sem lista intermediária
+        return (completeness + detail_score + COHERENCE_PLACEHOLDER) / 3.0
     
     async def find_similar_projects(self, project_data: Dict) -> List[Dict]:
         """Busca projetos similares no histórico"""
@@ -561,37 +726,57 @@ class ProjectPredictor:
     async def predict_approval_probability(self, project_data: Dict) -> float:
         """Prediz probabilidade de aprovação"""
         if not self.models_loaded:
-            await self.load_models()
+            await self.load_classical_models()
         
         # Extrair features do projeto
-        features = await self._extract_features(project_data)
+        features = self._extract_features(project_data)
         
-        # Fazer predição
+        # Fazer predição (em lote com as demais requisições em andamento)
         if self.approval_model:
-            probability = self.approval_model.predict_proba([features])[0][1]
-            return float(probability)
+            return await self.approval_batcher.submit(features)
         
         return 0.75  # Default
     
-    async def _extract_features(self, project_data: Dict) -> np.ndarray:
+    async def predict_approval_probability_batch(self, projects: List[Dict]) -> List[float]:
+        """Prediz a probabilidade de aprovação de vários projetos de uma vez"""
+        if not self.models_loaded:
+            await self.load_classical_models()
+        
+        if not projects:
+            return []
+        
+        # O lote já está formado: uma única chamada, sem passar pela fila
+        features = [self._extract_features(project) for project in projects]
+        if self.approval_model:
+            return await asyncio.to_thread(self._predict_approval_batch, features)
+        
+        return [0.75] * len(projects)  # Default
+    
+    def _predict_approval_batch(self, features: List[np.ndarray]) -> List[float]:
+        """Prediz a probabilidade de aprovação de um lote em uma única chamada"""
+        batch = np.vstack(features)
+        probabilities = self.approval_model.predict_proba(batch)[:, 1]
+        return probabilities.tolist()
+    
+    def _extract_features(self, project_data: Dict) -> np.ndarray:
         """Extrai features para os modelos"""
-        features = []
+        # Buffer float32 único, no dtype usado pelos modelos
+        features = np.empty(NUM_FEATURES, dtype=np.float32)
         
         # Features textuais
-        features.append(len(project_data.get('justification', '')))
-        features.append(len(project_data.get('objectives', {}).get('specific', [])))
+        features[0] = len(project_data.get('justification', ''))
+        features[1] = len(project_data.get('objectives', {}).get('specific', []))
         
         # Features numéricas
-        features.append(project_data.get('budget', {}).get('total', 0))
-        features.append(len(project_data.get('timeline', [])))
-        features.append(len(project_data.get('team', [])))
+        features[2] = project_data.get('budget', {}).get('total', 0)
+        features[3] = len(project_data.get('timeline', []))
+        features[4] = len(project_data.get('team', []))
         
         # Features categóricas (encoded)
         project_type = project_data.get('type', 'development')
-        type_encoding = {'research': 0, 'development': 1, 'training': 2}
-        features.append(type_encoding.get(project_type, 1))
+        features[5] = PROJECT_TYPE_ENCODING.get(project_type, 1)
         
-        return np.array(features)
+        return features
     
     async def generate_recommendations(
         self, validation_results: List[Dict], project_data: Dict
@@ -646,15 +831,22 @@ class ProjectPredictor:
         # Em produção, isso seria uma query ao banco
         return 42
     
+    async def close(self):
+        """Encerra o processamento em lote"""
+        await self.approval_batcher.close()
+    
     async def retrain_models(self):
         """Retreina modelos com novos dados"""
         logger.info("Iniciando retraining dos modelos...")
         
         # 1. Coletar dados de feedback
-        # 2. Preparar dataset de treino
-        # 3. Retreinar modelos
-        # 4. Validar performance
-        # 5. Deploy se melhor que modelo atual
+        feedback_data: List[Dict] = []
+        
+        # Treino em outro processo: o GIL não trava o event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(get_retrain_pool(), _retrain_sync, feedback_data)
         
-        await asyncio.sleep(1)  # Simulação
-        logger.info("Retraining concluído")
\ No newline at end of file
+        # Simulação só quando pedida explicitamente (desenvolvimento)
+        if SIMULATE_RETRAIN:
+            await asyncio.sleep(1)
+        logger.info("Retraining concluído")
@@ -1,17 +1,405 @@
 import torch
 from transformers import AutoTokenizer, AutoModel, pipeline
 from sentence_transformers import SentenceTransformer
+from optimum.onnxruntime import (
+    ORTModelForFeatureExtraction,
+    ORTModelForSequenceClassification,
+    ORTQuantizer,
+)
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+import onnxruntime as ort
 import spacy
+import ahocorasick
 from typing import List, Dict, Optional, Any
 import numpy as np
 import asyncio
-from sklearn.metrics.pairwise import cosine_similarity
+import fcntl
+import os
+import shutil
+import tempfile
+import re
+import time
+from functools import lru_cache
+from collections import OrderedDict
+from types import MappingProxyType
 import logging
 
+from .batching import BatchAnalyzer, PRONAS_MAX_BATCH, PRONAS_MAX_WAIT_MS
+from .cache import ResultCache, cache_key, GUIDELINES_CACHE_TTL
+
 logger = logging.getLogger(__name__)
 
+SPACY_MODEL = "pt_core_news_lg"
+BERT_MODEL = "neuralmind/bert-large-portuguese-cased"
+SENTENCE_MODEL = "rufimelo/Legal-BERTimbau-base"
+SENTIMENT_MODEL = "nlptown/bert-base-multilingual-uncased-sentiment"
+SUMMARIZATION_MODEL = "unicamp-dl/ptt5-base-portuguese-vocab"
+
+# Guideline batches large enough to be worth spreading over several spaCy
+# processes; smaller ones stay in-process (worker start-up would dominate)
+SPACY_N_PROCESS = int(os.getenv("PRONAS_SPACY_PROCESSES", max(1, (os.cpu_count() or 2) // 2)))
+SPACY_MULTIPROCESS_MIN_TEXTS = 32
+
+# Componentes desnecessários quando só precisamos das sentenças ou entidades
+SENTENCE_ONLY_DISABLE = ["morphologizer", "lemmatizer", "attribute_ruler", "ner"]
+ENTITIES_ONLY_DISABLE = ["morphologizer", "parser", "lemmatizer", "attribute_ruler"]
+
+# Constant lookup sets/tables, built once instead of per call or per token
+KEYWORD_POS = frozenset(("NOUN", "PROPN"))
+MERGE_CONCLUSION_FIELDS = frozenset(("justification", "objectives"))
+NEGATIVE_SENTIMENT_LABELS = frozenset(("1 star", "2 stars"))
+# Guidelines change at most daily; reload them hourly
+GUIDELINES_TTL = 3600
+
+# Dynamic INT8 quantization of the encoders' Linear layers (CPU only)
+INT8_ENCODERS = os.getenv("PRONAS_INT8_ENCODERS", "1") == "1"
+INT8_ENGINES = frozenset(("x86", "fbgemm", "onednn"))
+
+# Run generation pipelines in BF16 on CPUs with native BF16 support; halves
+# the memory traffic of the large matmuls. Classification stays FP32 since
+# its post-processing converts logits straight to NumPy, which has no bfloat16
+BF16_PIPELINES = os.getenv("PRONAS_BF16_PIPELINES", "1") == "1"
+BF16_TASKS = frozenset(("summarization",))
+
+# Run the torch encoders and pipelines on the GPU when one is visible, in
+# FP16 (tensor-core GEMMs, half the memory)
+GPU_FP16 = os.getenv("PRONAS_GPU_FP16", "1") == "1"
+
+# Approved-example embeddings kept per process (LRU)
+EXAMPLE_EMBEDDING_CACHE_SIZE = 10_000
+
+# Serve the sentence encoder and the sentiment classifier from ONNX Runtime
+# (fused graph + INT8) instead of eager PyTorch. Sessions are created per
+# worker: ORT thread pools do not survive fork, so they are never preloaded.
+ONNX_ENCODERS = os.getenv("PRONAS_ONNX_ENCODERS", "0") == "1"
+ONNX_MODELS_DIR = os.getenv("PRONAS_ONNX_DIR", "/models/onnx")
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model_quantized.onnx"
+
+# Keyword classes used to classify guideline sentences (substring match)
+SENTENCE_KEYWORDS = MappingProxyType({
+    "requirement": (
+        "deve", "deverá", "obrigatório", "necessário",
+        "requisito", "exigido", "precisa", "essencial"
+    ),
+    "objective": (
+        "objetivo", "meta", "finalidade", "propósito",
+        "visa", "busca", "pretende", "almeja"
+    ),
+    "restriction": (
+        "não pode", "proibido", "vedado", "limitado",
+        "restrição", "impedido", "exceto", "salvo"
+    ),
+    # Restriction types
+    "budget": ("orçamento", "valor"),
+    "timeline": ("prazo", "tempo"),
+    "team": ("equipe", "profissional"),
+    # Priority levels
+    "high": ("principal", "fundamental", "prioritário", "crítico"),
+    "low": ("secundário", "opcional", "desejável"),
+    # Requirement / restriction strength
+    "mandatory": ("deve", "obrigatório"),
+    "severe": ("vedado",),
+})
+RESTRICTION_TYPES = ("budget", "timeline", "team")
+
+# Closing phrases appended by _enhance_text, per field
+TEXT_ENHANCEMENTS = MappingProxyType({
+    "justification": (
+        "considerando as diretrizes do PRONAS/PCD",
+        "atendendo às necessidades da população com deficiência",
+        "promovendo inclusão e acessibilidade"
+    ),
+    "objectives": (
+        "de forma mensurável e alcançável",
+        "com indicadores claros de sucesso",
+        "alinhado às políticas públicas vigentes"
+    ),
+    "methodology": (
+        "seguindo metodologia científica rigorosa",
+        "com validação por especialistas",
+        "garantindo replicabilidade e sustentabilidade"
+    )
+})
+# Ordered: reported in this order by _identify_changes
+CHANGE_KEYWORDS = ("objetivo", "meta", "requisito", "diretriz", "inclusão")
+
+# _clean_text patterns: whitespace runs, space before punctuation and
+# repeated punctuation
+_WS_RE = re.compile(r"\s+")
+_PUNCT_SPACE_RE = re.compile(r" ([,.])")
+_PUNCT_DUP_RE = re.compile(r"([,.])\1+")
+
+
+def _build_automaton(keywords_by_class) -> ahocorasick.Automaton:
+    """Aho-Corasick automaton mapping each keyword to the classes it marks"""
+    classes_by_keyword: Dict[str, set] = {}
+    for cls, keywords in keywords_by_class.items():
+        for keyword in keywords:
+            classes_by_keyword.setdefault(keyword, set()).add(cls)
+    
+    automaton = ahocorasick.Automaton()
+    for keyword, classes in classes_by_keyword.items():
+        automaton.add_word(keyword, tuple(classes))
+    automaton.make_automaton()
+    return automaton
+
+
+# One linear pass over a sentence finds every keyword class at once
+SENTENCE_AUTOMATON = _build_automaton(SENTENCE_KEYWORDS)
+
+
+def keyword_classes(text_lower: str) -> frozenset:
+    """Keyword classes present in an already lower-cased text"""
+    return frozenset(
+        cls for _, classes in SENTENCE_AUTOMATON.iter(text_lower) for cls in classes
+    )
+
+
+@lru_cache(maxsize=32)
+def _guideline_keyword_automaton(keywords: tuple) -> ahocorasick.Automaton:
+    """Automaton over the (lower-cased) guideline keywords, built once per set"""
+    return _build_automaton({keyword: (keyword,) for keyword in keywords})
+
+MIN_SECTION_WORDS = MappingProxyType({
+    "justification": 200,
+    "objectives": 50,
+    "methodology": 150
+})
+
+
+@lru_cache(maxsize=None)
+def cpu_flags() -> frozenset:
+    """CPU feature flags reported by the kernel (empty if unavailable)"""
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return frozenset(line.split(":", 1)[1].split())
+    except OSError:
+        pass
+    return frozenset()
+
+
+@lru_cache(maxsize=None)
+def int8_supported() -> bool:
+    """Whether INT8 inference pays off here: x86 quantized engine with VNNI"""
+    if not INT8_ENCODERS or torch.backends.quantized.engine not in INT8_ENGINES:
+        return False
+    # Without VNNI, INT8 GEMMs are no faster than FP32
+    return not cpu_flags().isdisjoint(("avx512_vnni", "avx_vnni"))
+
+
+@lru_cache(maxsize=None)
+def bf16_supported() -> bool:
+    """Whether the CPU has native BF16 matmul support (AVX512-BF16 or AMX)"""
+    return BF16_PIPELINES and not cpu_flags().isdisjoint(("avx512_bf16", "amx_bf16"))
+
+
+@lru_cache(maxsize=None)
+def torch_device() -> torch.device:
+    """Device for this process's torch models
+
+    With several GPUs each worker process takes one (by pid), so the workers
+    spread over the cards instead of all landing on cuda:0.
+    """
+    if not torch.cuda.is_available():
+        return torch.device("cpu")
+    return torch.device("cuda", os.getpid() % torch.cuda.device_count())
+
+
+def to_inference_device(model: torch.nn.Module) -> torch.nn.Module:
+    """Move an eval-mode model to the GPU (FP16) or quantize it for the CPU"""
+    device = torch_device()
+    if device.type == "cpu":
+        return quantize_encoder(model)
+    model = model.to(device)
+    return model.half() if GPU_FP16 else model
+
+
+def quantize_encoder(model: torch.nn.Module) -> torch.nn.Module:
+    """Quantize Linear layers to INT8 when supported, else keep FP32"""
+    if not int8_supported():
+        return model
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+@lru_cache(maxsize=None)
+def load_spacy_model(name: str = SPACY_MODEL):
+    """Carrega o modelo SpaCy uma única vez por processo"""
+    return spacy.load(name)
+
+
+# Heavy models are cached per process as well. When they are loaded in the
+# master before the workers fork (see preload_models), every worker shares
+# the same weight pages copy-on-write instead of loading its own copy.
+# low_cpu_mem_usage avoids materializing a second, randomly initialized
+# copy of the weights while loading.
+@lru_cache(maxsize=None)
+def load_bert(name: str = BERT_MODEL):
+    """Load the BERT tokenizer and encoder once per process"""
+    tokenizer = AutoTokenizer.from_pretrained(name)
+    model = AutoModel.from_pretrained(name, low_cpu_mem_usage=True)
+    model = to_inference_device(model.eval())
+    # Weights in shared memory: workers forked after preload_models map the
+    # same pages instead of copying them
+    if torch_device().type == "cpu":
+        model.share_memory()
+    # Compiled lazily on the first forward pass; run forwards under
+    # torch.inference_mode() to skip autograd bookkeeping
+    return tokenizer, torch.compile(model, mode="reduce-overhead", dynamic=True)
+
+
+def export_onnx_model(model_class, name: str, save_dir: str, quantize: bool):
+    """Export the model to ONNX in save_dir, dynamically quantized to INT8 if asked"""
+    exported = model_class.from_pretrained(name, export=True)
+    if not quantize:
+        exported.save_pretrained(save_dir)
+        return
+    # avx512_vnni only where the CPU has it; AVX-VNNI machines take the AVX2 config
+    if "avx512_vnni" in cpu_flags():
+        quantization_config = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    else:
+        quantization_config = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+    ORTQuantizer.from_pretrained(exported).quantize(
+        save_dir=save_dir,
+        quantization_config=quantization_config
+    )
+
+
+@lru_cache(maxsize=None)
+def load_onnx_model(model_class, name: str):
+    """Load an ONNX export of the model, exporting it on first use
+
+    The export is INT8 where int8_supported(), FP32 elsewhere.
+    """
+    quantize = int8_supported()
+    file_name = ONNX_QUANTIZED_FILE if quantize else ONNX_MODEL_FILE
+    save_dir = os.path.join(
+        ONNX_MODELS_DIR, name.replace("/", "--") + ("-int8" if quantize else "")
+    )
+    if not os.path.isfile(os.path.join(save_dir, file_name)):
+        os.makedirs(ONNX_MODELS_DIR, exist_ok=True)
+        # Only one worker exports; the others wait on the lock and load its
+        # result. The export goes to a temporary directory renamed into
+        # place, so no worker ever reads a half-written model.
+        with open(f"{save_dir}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.isfile(os.path.join(save_dir, file_name)):
+                logger.info(f"Exporting {name} to ONNX ({'INT8' if quantize else 'FP32'})")
+                tmp_dir = tempfile.mkdtemp(prefix=".export-", dir=ONNX_MODELS_DIR)
+                try:
+                    export_onnx_model(model_class, name, tmp_dir, quantize)
+                    # Leftover of an interrupted export from before the lock
+                    shutil.rmtree(save_dir, ignore_errors=True)
+                    os.replace(tmp_dir, save_dir)
+                except BaseException:
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+                    raise
+    
+    # Attention, LayerNorm and GELU are fused at session creation
+    session_options = ort.SessionOptions()
+    session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return model_class.from_pretrained(
+        save_dir,
+        file_name=file_name,
+        provider="CPUExecutionProvider",
+        session_options=session_options
+    )
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode replacement backed by an ONNX Runtime session"""
+    
+    def __init__(self, name: str):
+        self.tokenizer = AutoTokenizer.from_pretrained(name)
+        self.model = load_onnx_model(ORTModelForFeatureExtraction, name)
+    
+    def encode(
+        self,
+        sentences,
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        show_progress_bar: bool = False,
+        normalize_embeddings: bool = False
+    ) -> np.ndarray:
+        """Mean-pooled sentence embeddings, like the sentence-transformers model"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+        
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            # Average only over real tokens, not padding
+            mask = inputs["attention_mask"][..., None].astype(hidden.dtype)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+        
+        embeddings = np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+@lru_cache(maxsize=None)
+def load_sentence_model(name: str = SENTENCE_MODEL):
+    """Load the sentence-embedding model once per process"""
+    if ONNX_ENCODERS:
+        return OnnxSentenceEncoder(name)
+    
+    model = SentenceTransformer(name, device=str(torch_device()))
+    # The first module wraps the transformer that does the heavy lifting;
+    # quantized kernels are CPU-only
+    if model.device.type == "cpu":
+        model[0].auto_model = quantize_encoder(model[0].auto_model)
+    elif GPU_FP16:
+        model.half()
+    return model
+
+
+@lru_cache(maxsize=None)
+def load_pipeline(task: str, model: str):
+    """Load a transformers pipeline once per process"""
+    if ONNX_ENCODERS and task == "sentiment-analysis":
+        return pipeline(
+            task,
+            model=load_onnx_model(ORTModelForSequenceClassification, model),
+            tokenizer=AutoTokenizer.from_pretrained(model)
+        )
+    device = torch_device()
+    model_kwargs = {"low_cpu_mem_usage": True}
+    if device.type == "cuda":
+        if GPU_FP16:
+            model_kwargs["torch_dtype"] = torch.float16
+    elif task in BF16_TASKS and bf16_supported():
+        model_kwargs["torch_dtype"] = torch.bfloat16
+    return pipeline(task, model=model, device=device, model_kwargs=model_kwargs)
+
+
+def preload_models():
+    """Load every NLP model into the current process (call before forking)"""
+    load_spacy_model()
+    # CUDA cannot be initialized before fork: GPU models load in each worker.
+    # The NVML-based check answers is_available() without creating a context
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    if torch.cuda.is_available():
+        return
+    load_bert()
+    load_pipeline("summarization", SUMMARIZATION_MODEL)
+    # ONNX Runtime sessions must be created after the fork
+    if not ONNX_ENCODERS:
+        load_sentence_model()
+        load_pipeline("sentiment-analysis", SENTIMENT_MODEL)
+
 class NLPEngine:
-    def __init__(self):
+    def __init__(self, cache: Optional[ResultCache] = None):
         self.bert_model = None
         self.tokenizer = None
         self.sentence_model = None
@@ -19,6 +407,26 @@ class NLPEngine:
         self.sentiment_analyzer = None
         self.summarizer = None
         self.guidelines_cache = {}
+        # Embeddings of approved examples, keyed by (project id, field, content hash)
+        self.example_embeddings: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        # Shared Redis cache for processed guidelines (optional)
+        self.cache = cache
+        
+        # Chamadas concorrentes de extract_entities são agrupadas em lotes
+        self.entity_batcher = BatchAnalyzer(self._extract_entities_batch)
+        # Concurrent sentiment / summarization requests share one forward pass
+        self.sentiment_batcher = BatchAnalyzer(
+            self._analyze_sentiment_batch,
+            max_batch=PRONAS_MAX_BATCH,
+            max_wait_ms=PRONAS_MAX_WAIT_MS,
+            name="sentiment"
+        )
+        self.summary_batcher = BatchAnalyzer(
+            self._summarize_batch,
+            max_batch=PRONAS_MAX_BATCH,
+            max_wait_ms=PRONAS_MAX_WAIT_MS,
+            name="summary"
+        )
         
     async def load_models(self):
         """Load NLP models"""
@@ -26,31 +434,17 @@ class NLPEngine:
             logger.info("Loading NLP models...")
             
             # BERT for Portuguese
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                'neuralmind/bert-large-portuguese-cased'
-            )
-            self.bert_model = AutoModel.from_pretrained(
-                'neuralmind/bert-large-portuguese-cased'
-            )
+            self.tokenizer, self.bert_model = load_bert()
             
             # Sentence embeddings
-            self.sentence_model = SentenceTransformer(
-                'rufimelo/Legal-BERTimbau-base'
-            )
+            self.sentence_model = load_sentence_model()
             
             # SpaCy for text processing
-            self.nlp = spacy.load("pt_core_news_lg")
+            self.nlp = load_spacy_model()
             
             # Additional pipelines
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="nlptown/bert-base-multilingual-uncased-sentiment"
-            )
-            
-            self.summarizer = pipeline(
-                "summarization",
-                model="unicamp-dl/ptt5-base-portuguese-vocab"
-            )
+            self.sentiment_analyzer = load_pipeline("sentiment-analysis", SENTIMENT_MODEL)
+            self.summarizer = load_pipeline("summarization", SUMMARIZATION_MODEL)
             
             logger.info("NLP models loaded successfully")
             
@@ -60,6 +454,15 @@ class NLPEngine:
     
     async def process_guidelines(self, texts: List[str]) -> Dict[str, Any]:
         """Process guidelines and extract structured information"""
+        if self.cache is None:
+            return await self._process_guidelines(texts)
+        return await self.cache.get_or_compute(
+            "guidelines", cache_key(*texts), GUIDELINES_CACHE_TTL,
+            lambda: self._process_guidelines(texts)
+        )
+    
+    async def _process_guidelines(self, texts: List[str]) -> Dict[str, Any]:
+        """Run the NLP pipeline over the guideline texts"""
         processed = {
             "requirements": [],
             "objectives": [],
@@ -69,10 +472,11 @@ class NLPEngine:
             "entities": []
         }
         
-        for text in texts:
-            # Process with SpaCy
-            doc = self.nlp(text)
-            
+        # Process with SpaCy in batch
+        n_process = SPACY_N_PROCESS if len(texts) >= SPACY_MULTIPROCESS_MIN_TEXTS else 1
+        docs = list(self.nlp.pipe(texts, batch_size=64, n_process=n_process))
+        
+        for doc in docs:
             # Extract entities
             for ent in doc.ents:
                 processed["entities"].append({
@@ -81,90 +485,68 @@ class NLPEngine:
                     "start": ent.start_char,
                     "end": ent.end_char
                 })
+        
+        # Embed every sentence of every text in one batched call instead of
+        # one encode() (batch of 1) per sentence. Unit vectors, like every
+        # other embedding here: consumers compare them with a plain dot product
+        sentences = [sent for doc in docs for sent in doc.sents]
+        sent_texts = [sent.text.strip() for sent in sentences]
+        embeddings = self.sentence_model.encode(
+            sent_texts,
+            batch_size=64,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True
+        ) if sent_texts else []
+        
+        # Extract requirements, objectives, etc.
+        for sent, sent_text, embedding in zip(sentences, sent_texts, embeddings):
+            # Every keyword signal below comes from this one automaton pass
+            classes = keyword_classes(sent_text.lower())
             
-            # Extract requirements, objectives, etc.
-            for sent in doc.sents:
-                sent_text = sent.text.strip()
-                sent_lower = sent_text.lower()
-                
-                # Create embedding for semantic analysis
-                embedding = self.sentence_model.encode(sent_text)
-                
-                # Classify sentence type
-                if self._is_requirement(sent_lower):
-                    processed["requirements"].append({
-                        "text": sent_text,
-                        "entities": [ent.text for ent in sent.ents],
-                        "embedding": embedding.tolist(),
-                        "mandatory": "deve" in sent_lower or "obrigatório" in sent_lower
-                    })
-                
-                elif self._is_objective(sent_lower):
-                    processed["objectives"].append({
-                        "text": sent_text,
-                        "embedding": embedding.tolist(),
-                        "priority": self._extract_priority(sent_text)
-                    })
-                
-                elif self._is_restriction(sent_lower):
-                    processed["restrictions"].append({
-                        "text": sent_text,
-                        "type": self._classify_restriction(sent_text),
-                        "severity": "high" if "vedado" in sent_lower else "medium"
-                    })
-                
-                # Extract keywords
-                for token in sent:
-                    if token.pos_ in ["NOUN", "PROPN"] and len(token.text) > 3:
-                        processed["keywords"].add(token.lemma_)
+            # Classify sentence type
+            if "requirement" in classes:
+                processed["requirements"].append({
+                    "text": sent_text,
+                    "entities": [ent.text for ent in sent.ents],
+                    "embedding": embedding.tolist(),
+                    "mandatory": "mandatory" in classes
+                })
+            
+            elif "objective" in classes:
+                processed["objectives"].append({
+                    "text": sent_text,
+                    "embedding": embedding.tolist(),
+                    "priority": self._extract_priority(classes)
+                })
+            
+            elif "restriction" in classes:
+                processed["restrictions"].append({
+                    "text": sent_text,
+                    "type": self._classify_restriction(classes),
+                    "severity": "high" if "severe" in classes else "medium"
+                })
+            
+            # Extract keywords
+            for token in sent:
+                if token.pos_ in KEYWORD_POS and len(token.text) > 3:
+                    processed["keywords"].add(token.lemma_)
         
         processed["keywords"] = list(processed["keywords"])
         return processed
     
-    def _is_requirement(self, text: str) -> bool:
-        """Check if text is a requirement"""
-        requirement_keywords = [
-            "deve", "deverá", "obrigatório", "necessário", 
-            "requisito", "exigido", "precisa", "essencial"
-        ]
-        return any(keyword in text for keyword in requirement_keywords)
-    
-    def _is_objective(self, text: str) -> bool:
-        """Check if text is an objective"""
-        objective_keywords = [
-            "objetivo", "meta", "finalidade", "propósito",
-            "visa", "busca", "pretende", "almeja"
-        ]
-        return any(keyword in text for keyword in objective_keywords)
-    
-    def _is_restriction(self, text: str) -> bool:
-        """Check if text is a restriction"""
-        restriction_keywords = [
-            "não pode", "proibido", "vedado", "limitado",
-            "restrição", "impedido", "exceto", "salvo"
-        ]
-        return any(keyword in text for keyword in restriction_keywords)
-    
-    def _classify_restriction(self, text: str) -> str:
-        """Classify type of restriction"""
-        if "orçamento" in text.lower() or "valor" in text.lower():
-            return "budget"
-        elif "prazo" in text.lower() or "tempo" in text.lower():
-            return "timeline"
-        elif "equipe" in text.lower() or "profissional" in text.lower():
-            return "team"
-        else:
-            return "general"
+    def _classify_restriction(self, classes: frozenset) -> str:
+        """Classify type of restriction from the sentence's keyword classes"""
+        for restriction_type in RESTRICTION_TYPES:
+            if restriction_type in classes:
+                return restriction_type
+        return "general"
     
-    def _extract_priority(self, text: str) -> str:
-        """Extract priority level from text"""
-        high_priority = ["principal", "fundamental", "prioritário", "crítico"]
-        low_priority = ["secundário", "opcional", "desejável"]
-        
-        text_lower = text.lower()
-        if any(word in text_lower for word in high_priority):
+    def _extract_priority(self, classes: frozenset) -> str:
+        """Extract priority level from the sentence's keyword classes"""
+        if "high" in classes:
             return "high"
-        elif any(word in text_lower for word in low_priority):
+        elif "low" in classes:
             return "low"
         return "medium"
     
@@ -176,34 +558,33 @@ class NLPEngine:
     ) -> Dict[str, Any]:
         """Improve text based on context and approved examples"""
         try:
-            # Get current text embedding
-            current_embedding = self.sentence_model.encode(text)
-            
             # Find similar approved texts
-            approved_examples = context.get("approved_projects", [])
+            approved_examples = [
+                example for example in context.get("approved_projects", [])
+                if field_type in example
+            ]
             improvements = []
             
-            for example in approved_examples:
-                if field_type in example:
-                    example_text = example[field_type]
-                    example_embedding = self.sentence_model.encode(example_text)
-                    
-                    # Calculate similarity
-                    similarity = cosine_similarity(
-                        [current_embedding], 
-                        [example_embedding]
-                    )[0][0]
-                    
-                    if 0.5 < similarity < 0.95:  # Similar but not identical
-                        improvements.append({
-                            "text": example_text,
-                            "similarity": float(similarity),
-                            "project_id": example.get("id")
-                        })
+            if approved_examples:
+                # Examples are embedded once and reused across requests; only
+                # the current text is encoded on a warm cache
+                example_matrix = self._example_embeddings(approved_examples, field_type)
+                current = self.sentence_model.encode(
+                    [text], convert_to_numpy=True, normalize_embeddings=True
+                )[0]
+                # Unit vectors: one matrix-vector product gives every cosine
+                similarities = example_matrix @ current
+                
+                candidates = np.flatnonzero((similarities > 0.5) & (similarities < 0.95))  # Similar but not identical
+                if len(candidates):
+                    best = candidates[np.argmax(similarities[candidates])]
+                    improvements.append({
+                        "text": approved_examples[best][field_type],
+                        "similarity": float(similarities[best]),
+                        "project_id": approved_examples[best].get("id")
+                    })
             
             if improvements:
-                # Sort by similarity
-                improvements.sort(key=lambda x: x["similarity"], reverse=True)
                 best_improvement = improvements[0]
                 
                 # Merge texts intelligently
@@ -239,6 +620,34 @@ class NLPEngine:
                 "changes_made": []
             }
     
+    def _example_embeddings(self, examples: List[Dict[str, Any]], field_type: str) -> np.ndarray:
+        """Normalized embeddings of the examples' field, served from an LRU cache"""
+        keys = [
+            (example.get("id"), field_type, cache_key(example[field_type]))
+            for example in examples
+        ]
+        missing = [i for i, key in enumerate(keys) if key not in self.example_embeddings]
+        
+        if missing:
+            encoded = self.sentence_model.encode(
+                [examples[i][field_type] for i in missing],
+                batch_size=64,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+                normalize_embeddings=True
+            )
+            for i, embedding in zip(missing, encoded):
+                self.example_embeddings[keys[i]] = embedding
+        
+        rows = []
+        for key in keys:
+            self.example_embeddings.move_to_end(key)
+            rows.append(self.example_embeddings[key])
+        while len(self.example_embeddings) > EXAMPLE_EMBEDDING_CACHE_SIZE:
+            self.example_embeddings.popitem(last=False)
+        
+        return np.stack(rows)
+    
     async def _merge_texts(
         self, 
         original: str, 
@@ -247,8 +656,9 @@ class NLPEngine:
     ) -> str:
         """Intelligently merge original text with reference"""
         # Parse both texts
-        doc_original = self.nlp(original)
-        doc_reference = self.nlp(reference)
+        doc_original, doc_reference = self.nlp.pipe(
+            [original, reference], disable=SENTENCE_ONLY_DISABLE
+        )
         
         # Extract key sentences from both
         original_sents = [sent.text for sent in doc_original.sents]
@@ -261,27 +671,33 @@ class NLPEngine:
         if reference_sents and field_type == "justification":
             merged_sentences.append(reference_sents[0])
         
+        # Encode both sides once, in a single batched call; unit-length
+        # vectors make cosine similarity a plain dot product
+        embeddings = self.sentence_model.encode(
+            original_sents + reference_sents,
+            batch_size=64,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True
+        )
+        original_embeddings = embeddings[:len(original_sents)]
+        reference_embeddings = embeddings[len(original_sents):]
+        
+        # Whole (N, M) similarity matrix in one GEMM; a sentence is unique
+        # when no reference sentence is too similar (> 0.85)
+        if reference_sents:
+            unique = (original_embeddings @ reference_embeddings.T).max(axis=1) <= 0.85
+        else:
+            unique = np.ones(len(original_sents), dtype=bool)
+        
         # Add unique content from original
-        for sent in original_sents:
-            sent_embedding = self.sentence_model.encode(sent)
-            is_unique = True
-            
-            for ref_sent in reference_sents:
-                ref_embedding = self.sentence_model.encode(ref_sent)
-                similarity = cosine_similarity(
-                    [sent_embedding], 
-                    [ref_embedding]
-                )[0][0]
-                
-                if similarity > 0.85:  # Too similar
-                    is_unique = False
-                    break
-            
-            if is_unique and len(sent.split()) > 5:  # Keep unique substantial sentences
+        for i in np.flatnonzero(unique):
+            sent = original_sents[i]
+            if len(sent.split()) > 5:  # Keep unique substantial sentences
                 merged_sentences.append(sent)
         
         # Add strong conclusions from reference
-        if reference_sents and field_type in ["justification", "objectives"]:
+        if reference_sents and field_type in MERGE_CONCLUSION_FIELDS:
             merged_sentences.append(reference_sents[-1])
         
         # Join and clean up
@@ -292,41 +708,23 @@ class NLPEngine:
     
     async def _enhance_text(self, text: str, field_type: str) -> str:
         """Enhance text with general improvements"""
-        enhancements = {
-            "justification": [
-                "considerando as diretrizes do PRONAS/PCD",
-                "atendendo às necessidades da população com deficiência",
-                "promovendo inclusão e acessibilidade"
-            ],
-            "objectives": [
-                "de forma mensurável e alcançável",
-                "com indicadores claros de sucesso",
-                "alinhado às políticas públicas vigentes"
-            ],
-            "methodology": [
-                "seguindo metodologia científica rigorosa",
-                "com validação por especialistas",
-                "garantindo replicabilidade e sustentabilidade"
-            ]
-        }
-        
         # Add relevant enhancements
         enhanced = text
-        if field_type in enhancements:
-            for enhancement in enhancements[field_type]:
-                if enhancement not in text.lower():
-                    enhanced += f", {enhancement}"
+        text_lower = text.lower()
+        for enhancement in TEXT_ENHANCEMENTS.get(field_type, ()):
+            if enhancement not in text_lower:
+                enhanced += f", {enhancement}"
         
         return self._clean_text(enhanced)
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         # Remove extra spaces
-        text = " ".join(text.split())
+        text = _WS_RE.sub(" ", text).strip()
         
         # Fix punctuation
-        text = text.replace(" ,", ",").replace(" .", ".")
-        text = text.replace(",,", ",").replace("..", ".")
+        text = _PUNCT_SPACE_RE.sub(r"\1", text)
+        text = _PUNCT_DUP_RE.sub(r"\1", text)
         
         # Ensure proper capitalization
         if text and text[0].islower():
@@ -354,7 +752,7 @@ class NLPEngine:
         improved_lower = improved.lower()
         
         keywords_added = []
-        for keyword in ["objetivo", "meta", "requisito", "diretriz", "inclusão"]:
+        for keyword in CHANGE_KEYWORDS:
             if keyword in improved_lower and keyword not in original_lower:
                 keywords_added.append(keyword)
         
@@ -379,27 +777,35 @@ class NLPEngine:
         
         # Check minimum length
         word_count = len(content.split())
-        min_lengths = {
-            "justification": 200,
-            "objectives": 50,
-            "methodology": 150
-        }
+        min_words = MIN_SECTION_WORDS.get(section)
         
-        if section in min_lengths and word_count < min_lengths[section]:
+        if min_words is not None and word_count < min_words:
             validation_result["issues"].append({
                 "type": "length",
-                "message": f"{section} deve ter pelo menos {min_lengths[section]} palavras (atual: {word_count})"
+                "message": f"{section} deve ter pelo menos {min_words} palavras (atual: {word_count})"
             })
             validation_result["score"] -= 0.2
         
         # Check for required keywords
         required_keywords = guidelines.get("keywords", [])
-        content_lower = content.lower()
+        top_keywords = required_keywords[:10]  # Check top 10 keywords
         missing_keywords = []
         
-        for keyword in required_keywords[:10]:  # Check top 10 keywords
-            if keyword.lower() not in content_lower:
-                missing_keywords.append(keyword)
+        if top_keywords:
+            # Lower-cased once at load time when the guidelines come from
+            # load_current_guidelines
+            keywords_lower = guidelines.get("_keywords_lower")
+            if keywords_lower is None:
+                keywords_lower = tuple(k.lower() for k in required_keywords)
+            top_lower = keywords_lower[:len(top_keywords)]
+            
+            # Single pass over the content for all keywords (multi-word ones
+            # included, which a word-set lookup would miss)
+            automaton = _guideline_keyword_automaton(top_lower)
+            found = {keyword for _, (keyword,) in automaton.iter(content.lower())}
+            missing_keywords = [
+                k for k, k_lower in zip(top_keywords, top_lower) if k_lower not in found
+            ]
         
         if missing_keywords:
             validation_result["issues"].append({
@@ -409,8 +815,8 @@ class NLPEngine:
             validation_result["score"] -= 0.1 * len(missing_keywords)
         
         # Check sentiment and tone
-        sentiment = self.sentiment_analyzer(content[:512])[0]  # Limit for model
-        if sentiment["label"] in ["1 star", "2 stars"]:
+        sentiment = await self.sentiment_batcher.submit(content[:512])  # Limit for model
+        if sentiment["label"] in NEGATIVE_SENTIMENT_LABELS:
             validation_result["issues"].append({
                 "type": "tone",
                 "message": "Tom do texto pode ser melhorado para ser mais positivo e construtivo"
@@ -435,9 +841,10 @@ class NLPEngine:
     
     async def load_current_guidelines(self) -> Dict[str, Any]:
         """Load current PRONAS/PCD guidelines"""
-        # Check cache first
-        if "current" in self.guidelines_cache:
-            return self.guidelines_cache["current"]
+        # Check cache first (entries expire after GUIDELINES_TTL seconds)
+        cached = self.guidelines_cache.get("current")
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
         
         # In production, this would load from database or external source
         guidelines = {
@@ -459,13 +866,19 @@ class NLPEngine:
                 "Não duplicar serviços existentes"
             ]
         }
+        # Lower-cased keywords for validate_section, computed once per load
+        guidelines["_keywords_lower"] = tuple(k.lower() for k in guidelines["keywords"])
         
-        self.guidelines_cache["current"] = guidelines
+        self.guidelines_cache["current"] = (time.monotonic() + GUIDELINES_TTL, guidelines)
         return guidelines
     
+    def invalidate_guidelines(self):
+        """Drop cached guidelines so the next call reloads them"""
+        self.guidelines_cache.clear()
+    
     async def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """Extract named entities from text"""
-        doc = self.nlp(text)
+        doc = await self.entity_batcher.submit(text)
         entities = []
         
         for ent in doc.ents:
@@ -478,20 +891,19 @@ class NLPEngine:
         
         return entities
     
+    def _extract_entities_batch(self, texts: List[str]) -> list:
+        """Run NER over a batch of texts in a single nlp.pipe call"""
+        return list(self.nlp.pipe(
+            texts, batch_size=len(texts), disable=ENTITIES_ONLY_DISABLE
+        ))
+    
     async def summarize_text(self, text: str, max_length: int = 150) -> str:
         """Summarize long text"""
         try:
             if len(text.split()) < max_length:
                 return text
             
-            summary = self.summarizer(
-                text,
-                max_length=max_length,
-                min_length=50,
-                do_sample=False
-            )
-            
-            return summary[0]["summary_text"]
+            return await self.summary_batcher.submit((text, max_length))
         except Exception as e:
             logger.error(f"Error summarizing text: {str(e)}")
             # Fallback to simple truncation
@@ -501,18 +913,45 @@ class NLPEngine:
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Analyze sentiment of text"""
         try:
-            result = self.sentiment_analyzer(text[:512])
+            result = await self.sentiment_batcher.submit(text[:512])
             return {
-                "label": result[0]["label"],
-                "score": result[0]["score"]
+                "label": result["label"],
+                "score": result["score"]
             }
         except Exception as e:
             logger.error(f"Error analyzing sentiment: {str(e)}")
             return {"label": "neutral", "score": 0.5}
     
+    def _analyze_sentiment_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Classify a batch of texts in a single pipeline call"""
+        return self.sentiment_analyzer(texts, batch_size=len(texts))
+    
+    def _summarize_batch(self, items: List[tuple]) -> List[str]:
+        """Summarize a batch of (text, max_length) items, one call per length"""
+        summaries = [None] * len(items)
+        by_length: Dict[int, List[int]] = {}
+        for i, (_, max_length) in enumerate(items):
+            by_length.setdefault(max_length, []).append(i)
+        
+        for max_length, indices in by_length.items():
+            outputs = self.summarizer(
+                [items[i][0] for i in indices],
+                max_length=max_length,
+                min_length=50,
+                do_sample=False,
+                batch_size=len(indices)
+            )
+            for i, output in zip(indices, outputs):
+                summaries[i] = output["summary_text"]
+        
+        return summaries
+    
     async def cleanup(self):
         """Cleanup resources"""
         logger.info("Cleaning up NLP engine resources")
+        await self.entity_batcher.close()
+        await self.sentiment_batcher.close()
+        await self.summary_batcher.close()
         # Clear cache
         self.guidelines_cache.clear()
         # Clear models from memory if needed
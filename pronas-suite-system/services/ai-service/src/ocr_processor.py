@@ -1,93 +1,292 @@
-import pytesseract
 from PIL import Image
-import pdf2image
+import pypdfium2 as pdfium
 import cv2
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import aiohttp
 import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
+import multiprocessing
 import logging
+import os
+
+from .cache import ResultCache, cache_key, OCR_CACHE_TTL
 
 logger = logging.getLogger(__name__)
 
+# Equivalente a '--oem 1 --psm 6 -l por': só o motor LSTM, sem carregar o
+# modelo legado em cada processo do pool
+TESSERACT_LANG = 'por'
+TESSERACT_PSM = 'SINGLE_BLOCK'
+TESSERACT_OEM = 'LSTM_ONLY'
+
+# 150 DPI em escala de cinza é suficiente para o Tesseract
+RENDER_DPI = 150
+
+# Acima deste desvio-padrão do ruído (níveis de cinza, medido no fundo da
+# página) ela passa pelo fastNlMeansDenoising; abaixo, basta um filtro de
+# mediana
+DENOISE_NOISE_SIGMA = float(os.getenv("OCR_DENOISE_NOISE_SIGMA", 4))
+
+# Inclinação mínima (graus) para rotacionar a página
+MIN_DESKEW_ANGLE = 0.5
+
+# Mínimo de caracteres para confiar na camada de texto de uma página
+MIN_TEXT_LAYER_CHARS = 20
+# Fração mínima de letras entre os caracteres visíveis: abaixo disso a
+# camada de texto é lixo (fontes sem mapeamento Unicode) e a página vai
+# para o OCR
+MIN_TEXT_LAYER_ALPHA_RATIO = 0.5
+
+# Cada worker do gunicorn (WEB_CONCURRENCY) tem o próprio pool: dividir as
+# CPUs entre eles, em vez de um processo por núcleo em cada worker
+OCR_WORKERS = int(os.getenv(
+    "OCR_WORKERS",
+    max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", 1)))
+))
+
+# Conexões mantidas abertas entre downloads de documentos
+DOWNLOAD_CONNECTION_LIMIT = 32
+DOWNLOAD_KEEPALIVE_TIMEOUT = 60
+
+# Sessão do Tesseract de cada processo do pool
+_worker_api = None
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+
+# O PDFium não é thread-safe: todo acesso passa por uma única thread,
+# fora do event loop
+_pdfium_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfium")
+
+
+def _init_ocr_worker():
+    """Inicializa o processo do pool com uma sessão própria do Tesseract"""
+    global _worker_api
+    # Tesseract é mais rápido em modo single-thread. O limite precisa estar
+    # no ambiente antes de a biblioteca nativa ser carregada, e vale só para
+    # os processos do pool: o tesserocr é importado apenas aqui
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    from tesserocr import PyTessBaseAPI, PSM, OEM
+    
+    _worker_api = PyTessBaseAPI(
+        lang=TESSERACT_LANG,
+        psm=getattr(PSM, TESSERACT_PSM),
+        oem=getattr(OEM, TESSERACT_OEM)
+    )
+
+
+def _estimate_background_noise(gray: np.ndarray, smooth: np.ndarray) -> float:
+    """Desvio-padrão do ruído estimado no fundo da página
+
+    MAD do passa-alta (imagem menos a mediana 3x3) nos pixels claros longe
+    do texto: bordas de letras nítidas não contam como ruído.
+    """
+    _, background = cv2.threshold(smooth, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    background = cv2.erode(background, np.ones((5, 5), np.uint8))
+    residual = cv2.absdiff(gray, smooth)[background > 0]
+    if not residual.size:
+        return 0.0
+    return 1.4826 * float(np.median(residual))
+
+
+def _ocr_page(image: np.ndarray, preprocess: bool = True) -> str:
+    """Aplica OCR em uma página dentro de um processo do pool"""
+    if preprocess:
+        image = OCRProcessor._preprocess_image(image)
+    
+    # Entregar o buffer uint8 direto ao Tesseract, sem passar pelo PIL
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape[:2]
+    bytes_per_pixel = image.shape[2] if image.ndim == 3 else 1
+    _worker_api.SetImageBytes(
+        image.tobytes(), width, height, bytes_per_pixel, image.strides[0]
+    )
+    return _worker_api.GetUTF8Text()
+
+
+def _has_usable_text_layer(text: str) -> bool:
+    """Indica se a camada de texto da página dispensa o OCR"""
+    visible = ''.join(text.split())
+    if len(visible) < MIN_TEXT_LAYER_CHARS:
+        return False
+    letters = sum(ch.isalpha() for ch in visible)
+    return letters >= MIN_TEXT_LAYER_ALPHA_RATIO * len(visible)
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """Retorna o pool de processos de OCR, criando-o no primeiro uso"""
+    global _ocr_pool
+    if _ocr_pool is None:
+        # spawn: processos novos, que não herdam o ambiente já carregado do
+        # worker HTTP nem os modelos pré-carregados pelo mestre do gunicorn
+        _ocr_pool = ProcessPoolExecutor(
+            max_workers=OCR_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_ocr_worker
+        )
+    return _ocr_pool
+
+
+def shutdown_ocr_pool():
+    """Encerra o pool de processos de OCR, se tiver sido criado"""
+    global _ocr_pool
+    if _ocr_pool is not None:
+        _ocr_pool.shutdown(cancel_futures=True)
+        _ocr_pool = None
+
 class OCRProcessor:
-    def __init__(self):
+    def __init__(self, cache: Optional[ResultCache] = None):
         self.supported_formats = ['.pdf', '.png', '.jpg', '.jpeg', '.tiff']
-        self.tesseract_config = '--oem 3 --psm 6 -l por'
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
         
     async def extract_text(self, document_url: str) -> str:
         """Extrai texto de documento usando OCR"""
+        if self.cache is None:
+            return await self._extract_text(document_url)
+        return await self.cache.get_or_compute(
+            "ocr", cache_key(document_url), OCR_CACHE_TTL,
+            lambda: self._extract_text(document_url)
+        )
+    
+    async def _extract_text(self, document_url: str) -> str:
+        """Baixa o documento e extrai o texto"""
         try:
             # Download do documento
             document_bytes = await self._download_document(document_url)
-            
-            # Determinar tipo de documento
-            if document_url.lower().endswith('.pdf'):
-                return await self._extract_from_pdf(document_bytes)
-            else:
-                return await self._extract_from_image(document_bytes)
+            return await self._extract_text_from_bytes(document_url, document_bytes)
                 
         except Exception as e:
             logger.error(f"Erro no OCR para {document_url}: {str(e)}")
             raise
     
+    async def _extract_text_from_bytes(self, document_url: str, document_bytes: bytes) -> str:
+        """Extrai texto de um documento já baixado"""
+        # Determinar tipo de documento
+        if document_url.lower().endswith('.pdf'):
+            return await self._extract_from_pdf(document_bytes)
+        else:
+            return await self._extract_from_image(document_bytes)
+    
+    async def extract_text_from_pdf_bytes(self, pdf_bytes: bytes) -> str:
+        """Extrai texto de um PDF já carregado em memória"""
+        return await self._extract_from_pdf(pdf_bytes)
+    
+    async def extract_text_from_pdf_path(self, pdf_path: str) -> str:
+        """Extrai texto de um PDF salvo em disco, sem carregá-lo em memória"""
+        return await self._extract_from_pdf(pdf_path)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Retorna a sessão HTTP compartilhada, criando-a no primeiro uso"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=DOWNLOAD_CONNECTION_LIMIT,
+                    keepalive_timeout=DOWNLOAD_KEEPALIVE_TIMEOUT
+                )
+            )
+        return self._session
+    
     async def _download_document(self, url: str) -> bytes:
         """Faz download do documento"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                return await response.read()
-    
-    async def _extract_from_pdf(self, pdf_bytes: bytes) -> str:
-        """Extrai texto de PDF"""
-        # Converter PDF para imagens
-        images = pdf2image.convert_from_bytes(pdf_bytes, dpi=300)
-        
-        texts = []
-        for i, image in enumerate(images):
-            # Preprocessar imagem
-            processed_image = self._preprocess_image(np.array(image))
-            
-            # Aplicar OCR
-            text = pytesseract.image_to_string(
-                processed_image,
-                config=self.tesseract_config
-            )
-            texts.append(text)
-            
-            logger.info(f"Processada página {i+1} do PDF")
+        async with self._get_session().get(url) as response:
+            return await response.read()
+    
+    async def cleanup(self):
+        """Fecha a sessão HTTP compartilhada"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def _extract_from_pdf(self, pdf: Union[bytes, str]) -> str:
+        """Extrai texto de PDF (conteúdo em bytes ou caminho do arquivo)"""
+        loop = asyncio.get_running_loop()
+        texts, images, ocr_pages = await loop.run_in_executor(
+            _pdfium_executor, self._load_pdf_pages, pdf
+        )
+        
+        # PDF nativo: nenhuma página precisa passar pelo Tesseract
+        if not images:
+            logger.info("PDF com camada de texto, OCR dispensado")
+            return '\n\n'.join(texts)
+        
+        for i, text in zip(ocr_pages, await self._ocr_images(images)):
+            texts[i] = text
         
         return '\n\n'.join(texts)
     
+    @staticmethod
+    def _load_pdf_pages(pdf: Union[bytes, str]):
+        """Lê a camada de texto das páginas e renderiza as que precisam de OCR"""
+        pdf = pdfium.PdfDocument(pdf)
+        try:
+            texts = [""] * len(pdf)
+            images, ocr_pages = [], []
+            for i, page in enumerate(pdf):
+                # Páginas com camada de texto não precisam de OCR
+                text = page.get_textpage().get_text_range()
+                if _has_usable_text_layer(text):
+                    texts[i] = text
+                    continue
+                
+                # Renderizar a página em escala de cinza direto para um
+                # array uint8 (cópia própria, o bitmap do PDFium é liberado)
+                bitmap = page.render(scale=RENDER_DPI / 72, grayscale=True)
+                images.append(np.array(bitmap.to_numpy()))
+                ocr_pages.append(i)
+        finally:
+            pdf.close()
+        
+        return texts, images, ocr_pages
+    
     async def _extract_from_image(self, image_bytes: bytes) -> str:
         """Extrai texto de imagem"""
-        # Carregar imagem
-        image = Image.open(BytesIO(image_bytes))
+        # Carregar imagem já em escala de cinza (uma única conversão)
+        image = Image.open(BytesIO(image_bytes)).convert('L')
         
-        # Preprocessar
-        processed_image = self._preprocess_image(np.array(image))
+        # Preprocessar e aplicar OCR no pool, fora do event loop
+        texts = await self._ocr_images([np.asarray(image)], preprocess=True)
+        return texts[0]
+    
+    async def _ocr_images(self, images, preprocess: bool = True) -> List[str]:
+        """Distribui as páginas entre os processos do pool de OCR"""
+        loop = asyncio.get_running_loop()
+        pool = get_ocr_pool()
         
-        # Aplicar OCR
-        text = pytesseract.image_to_string(
-            processed_image,
-            config=self.tesseract_config
-        )
+        # gather preserva a ordem das páginas
+        texts = await asyncio.gather(*[
+            loop.run_in_executor(pool, _ocr_page, np.asarray(image), preprocess)
+            for image in images
+        ])
         
-        return text
+        logger.info(f"Processadas {len(texts)} páginas")
+        return list(texts)
     
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
+    @staticmethod
+    def _preprocess_image(image: np.ndarray) -> np.ndarray:
         """Preprocessa imagem para melhorar OCR"""
         # Converter para escala de cinza
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if image.ndim == 3:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = image
         
-        # Remover ruído
-        denoised = cv2.fastNlMeansDenoising(gray)
+        # Remover ruído: o fastNlMeans (dominante no custo) só em páginas
+        # ruidosas; nas demais a própria mediana usada na estimativa basta
+        smooth = cv2.medianBlur(gray, 3)
+        if _estimate_background_noise(gray, smooth) > DENOISE_NOISE_SIGMA:
+            denoised = cv2.fastNlMeansDenoising(
+                gray, h=10, templateWindowSize=7, searchWindowSize=15
+            )
+        else:
+            denoised = smooth
         
-        # Binarização adaptativa
+        # Binarização adaptativa, no próprio buffer do denoise
         binary = cv2.adaptiveThreshold(
             denoised, 255,
             cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY, 11, 2
+            cv2.THRESH_BINARY, 11, 2,
+            dst=denoised
         )
         
         # Correção de inclinação
@@ -96,6 +295,10 @@ class OCRProcessor:
         
         if angle < -45:
             angle = 90 + angle
+        
+        # Inclinação desprezível: evitar o warpAffine da página inteira
+        if abs(angle) < MIN_DESKEW_ANGLE:
+            return binary
             
         (h, w) = binary.shape[:2]
         center = (w // 2, h // 2)
@@ -112,25 +315,58 @@ class OCRProcessor:
         """Extrai tabelas de documentos"""
         # Implementação para extração de tabelas
         document_bytes = await self._download_document(document_url)
-        
+        return await self._extract_tables_from_bytes(document_url, document_bytes)
+    
+    async def _extract_tables_from_bytes(self, document_url: str, document_bytes: bytes) -> List[Dict]:
+        """Extrai tabelas de um documento já baixado"""
         if document_url.lower().endswith('.pdf'):
-            import tabula
-            tables = tabula.read_pdf(BytesIO(document_bytes), pages='all')
-            return [table.to_dict() for table in tables]
+            # tabula é bloqueante (JVM): executar fora do event loop
+            return await asyncio.to_thread(self._read_pdf_tables, document_bytes)
         
         return []
     
-    async def extract_structured_data(self, document_url: str) -> Dict:
-        """Extrai dados estruturados do documento"""
-        text = await self.extract_text(document_url)
-        tables = await self.extract_tables(document_url)
+    @staticmethod
+    def _read_pdf_tables(document_bytes: bytes) -> List[Dict]:
+        """Lê as tabelas de um PDF com o tabula"""
+        import tabula
+        tables = tabula.read_pdf(BytesIO(document_bytes), pages='all')
+        return [table.to_dict() for table in tables]
+    
+    async def extract_all(self, document_url: str) -> Dict:
+        """Extrai texto e dados estruturados com um único download e OCR"""
+        document_bytes = await self._download_document(document_url)
+        
+        # O texto passa pelo mesmo cache de extract_text: um OCR feito antes
+        # para a mesma URL é reaproveitado
+        async def extract_text() -> str:
+            return await self._extract_text_from_bytes(document_url, document_bytes)
+        
+        if self.cache is not None:
+            text_task = self.cache.get_or_compute(
+                "ocr", cache_key(document_url), OCR_CACHE_TTL, extract_text
+            )
+        else:
+            text_task = extract_text()
+        
+        text, tables = await asyncio.gather(
+            text_task,
+            self._extract_tables_from_bytes(document_url, document_bytes)
+        )
         
         return {
             "text": text,
-            "tables": tables,
-            "metadata": {
-                "url": document_url,
-                "word_count": len(text.split()),
-                "char_count": len(text)
+            "structured_data": {
+                "text": text,
+                "tables": tables,
+                "metadata": {
+                    "url": document_url,
+                    "word_count": len(text.split()),
+                    "char_count": len(text)
+                }
             }
-        }
\ No newline at end of file
+        }
+    
+    async def extract_structured_data(self, document_url: str) -> Dict:
+        """Extrai dados estruturados do documento"""
+        result = await self.extract_all(document_url)
+        return result["structured_data"]
@@ -0,0 +1,32 @@
+"""make catalog item_code unique per source
+
+Revision ID: c3d4e5f6a7b8
+Revises: b2c3d4e5f6a7
+Create Date: 2025-09-24 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d4e5f6a7b8'
+down_revision: Union[str, None] = 'b2c3d4e5f6a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Remove duplicatas de ingestões repetidas (mesma fonte e código),
+    # mantendo o registro mais antigo
+    op.execute(
+        'DELETE FROM catalog_items a USING catalog_items b '
+        'WHERE a.source = b.source AND a.item_code = b.item_code AND a.id > b.id'
+    )
+    # item_code é único dentro de cada fonte (alvo do upsert da ingestão)
+    op.create_unique_constraint('uq_catalog_source_itemcode', 'catalog_items', ['source', 'item_code'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_catalog_source_itemcode', 'catalog_items', type_='unique')
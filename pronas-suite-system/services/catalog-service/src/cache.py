@@ -0,0 +1,86 @@
+from typing import Optional, Tuple
+from fastapi import Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+from cachetools import TTLCache
+import os
+import time
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Namespace das buscas em cache (invalidado após cada ingestão)
+SEARCH_CACHE_NAMESPACE = "search"
+
+# Cópia por processo das respostas em cache, consultada antes do Redis
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", 2048))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", 30))
+
+
+def query_key_builder(
+    func,
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: tuple = (),
+    kwargs: Optional[dict] = None
+) -> str:
+    """Chave pelo caminho e pela query string
+
+    Ignora os demais argumentos do endpoint (sessão do banco, usuário), que
+    mudam a cada requisição e nunca gerariam acertos.
+    """
+    params = sorted(request.query_params.multi_items())
+    return f"{namespace}:{request.url.path}:{params}"
+
+
+class LocalRedisBackend(RedisBackend):
+    """Backend em dois níveis: memória do processo e Redis
+
+    Buscas repetidas (autocomplete) são servidas sem ida ao Redis. A limpeza
+    feita pelo worker após uma ingestão só alcança o Redis: cada processo
+    pode servir resultados antigos por até LOCAL_CACHE_TTL segundos.
+    """
+
+    def __init__(self, redis: aioredis.Redis):
+        super().__init__(redis)
+        # chave -> (expiração monotônica, resposta codificada)
+        self._local = TTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL)
+
+    def _local_get(self, key: str) -> Tuple[int, Optional[bytes]]:
+        expires_at, value = self._local.get(key, (0, None))
+        ttl = int(expires_at - time.monotonic())
+        return (ttl, value) if ttl > 0 else (0, None)
+
+    def _local_set(self, key: str, value: bytes, ttl: Optional[int]):
+        # Nunca além do prazo da entrada no Redis
+        if ttl and ttl > 0:
+            self._local[key] = (time.monotonic() + ttl, value)
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        ttl, value = self._local_get(key)
+        if value is not None:
+            return ttl, value
+        ttl, value = await super().get_with_ttl(key)
+        if value is not None:
+            self._local_set(key, value, ttl)
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return (await self.get_with_ttl(key))[1]
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await super().set(key, value, expire)
+        self._local_set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        self._local.clear()
+        return await super().clear(namespace, key)
+
+
+def init_response_cache() -> aioredis.Redis:
+    """Registra o cache local + Redis como backend do cache de respostas"""
+    client = aioredis.from_url(REDIS_URL)
+    FastAPICache.init(LocalRedisBackend(client), prefix="catalog")
+    return client
@@ -1,58 +1,194 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from . import models, schemas
-import pandas as pd
-from typing import IO
-
-def search_items(db: Session, query: str, skip: int = 0, limit: int = 100):
-    search_query = f"%{query}%"
-    return db.query(models.CatalogItem).filter(
-        or_(
-            models.CatalogItem.name.ilike(search_query),
-            models.CatalogItem.description.ilike(search_query)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, String, and_, bindparam, func, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from . import models
+import asyncio
+import asyncpg
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from io import BytesIO
+from typing import IO, Optional, Tuple
+
+# Consultas da busca montadas uma vez, na importação: por requisição só os
+# parâmetros mudam, sem reconstruir a expressão do SQLAlchemy
+_SEARCH_SCORE = func.similarity(models.CatalogItem.name, bindparam("query", type_=String))
+_SEARCH_ITEMS = select(models.CatalogItem, _SEARCH_SCORE).where(
+    # Atendido pelos índices GIN de trigramas em name/description
+    or_(
+        models.CatalogItem.name.ilike(bindparam("pattern", type_=String)),
+        models.CatalogItem.description.ilike(bindparam("pattern", type_=String))
+    )
+).order_by(
+    # Mais parecidos pelo nome primeiro (pg_trgm); id desempata
+    _SEARCH_SCORE.desc(),
+    models.CatalogItem.id
+).limit(bindparam("limit"))
+# Continua exatamente depois do último item visto, na mesma ordem
+_SEARCH_ITEMS_AFTER = _SEARCH_ITEMS.where(
+    or_(
+        _SEARCH_SCORE < bindparam("after_score", type_=Float),
+        and_(
+            _SEARCH_SCORE == bindparam("after_score", type_=Float),
+            models.CatalogItem.id > bindparam("after_id")
+        )
+    )
+)
+
+async def search_items(
+    db: AsyncSession,
+    query: str,
+    after: Optional[Tuple[float, int]] = None,
+    limit: int = 100
+):
+    """Busca paginada por chave: retorna pares (item, similaridade)
+
+    ``after`` é o (similaridade, id) do último item da página anterior.
+    """
+    params = {"query": query, "pattern": f"%{query}%", "limit": limit}
+    if after is None:
+        result = await db.execute(_SEARCH_ITEMS, params)
+    else:
+        params["after_score"], params["after_id"] = after
+        result = await db.execute(_SEARCH_ITEMS_AFTER, params)
+    return result.all()
+
+class CSVIngestError(ValueError):
+    """O arquivo CSV enviado não pôde ser lido"""
+
+
+# Colunas do CSV do RENEM e os campos correspondentes do nosso modelo
+RENEM_COLUMNS = {
+    'Cod. Item': 'item_code',
+    'Item': 'name',
+    'Definição': 'description',
+    'R$ Valor Sugerido': 'suggested_price'
+}
+# Ordem das colunas enviadas pelo COPY
+COPY_COLUMNS = ('name', 'description', 'source', 'item_code', 'item_type', 'suggested_price')
+# Bytes do CSV lidos por lote; cada lote é uma transação da ingestão
+INGEST_BLOCK_SIZE = 4 << 20
+# Preço já normalizado ("1.234,56" -> "1234.56") antes da conversão
+_PRICE_PATTERN = r'^-?\d+(\.\d+)?$'
+
+# O COPY não tem ON CONFLICT: os lotes passam por uma tabela temporária
+# (esvaziada a cada commit) e seguem para catalog_items por INSERT ... SELECT
+_STAGING_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS renem_staging ("
+    "name text, description text, source text, item_code text, "
+    "item_type text, suggested_price double precision"
+    ") ON COMMIT DELETE ROWS"
+)
+# Upsert por (source, item_code): itens novos são inseridos e os existentes
+# só são atualizados se nome, descrição ou preço mudaram. Um código repetido
+# no mesmo lote entra uma vez só (a última ocorrência), pois o DO UPDATE não
+# pode afetar a mesma linha duas vezes; itens sem código são sempre inseridos
+_STAGING_MERGE = (
+    "WITH merged AS ("
+    f"INSERT INTO catalog_items ({', '.join(COPY_COLUMNS)}) "
+    f"(SELECT DISTINCT ON (source, item_code) {', '.join(COPY_COLUMNS)} FROM renem_staging "
+    "WHERE item_code IS NOT NULL ORDER BY source, item_code, ctid DESC) "
+    f"UNION ALL SELECT {', '.join(COPY_COLUMNS)} FROM renem_staging WHERE item_code IS NULL "
+    "ON CONFLICT ON CONSTRAINT uq_catalog_source_itemcode DO UPDATE SET "
+    "name = EXCLUDED.name, description = EXCLUDED.description, "
+    "suggested_price = EXCLUDED.suggested_price, updated_at = now() "
+    "WHERE (catalog_items.name, catalog_items.description, catalog_items.suggested_price) "
+    "IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.description, EXCLUDED.suggested_price) "
+    "RETURNING (xmax = 0) AS inserted"
+    ") SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM merged"
+)
+
+
+def _clean_renem_batch(batch: pa.RecordBatch) -> pa.Table:
+    """Converte um lote do CSV do RENEM nas colunas de catalog_items"""
+    columns = {RENEM_COLUMNS[name]: batch.column(name) for name in RENEM_COLUMNS}
+    
+    if columns['name'].null_count:
+        raise CSVIngestError("CSV do RENEM inválido: há itens sem nome")
+    
+    # Limpeza vetorizada do preço; valores não numéricos viram nulos
+    price = pc.replace_substring(columns['suggested_price'], '.', '')
+    price = pc.utf8_trim_whitespace(pc.replace_substring(price, ',', '.'))
+    valid = pc.fill_null(pc.match_substring_regex(price, _PRICE_PATTERN), False)
+    columns['suggested_price'] = pc.cast(pc.if_else(valid, price, None), pa.float64())
+    
+    columns['source'] = pa.repeat('RENEM', batch.num_rows)
+    columns['item_type'] = pa.repeat('Equipamento', batch.num_rows)
+    return pa.table({name: columns[name] for name in COPY_COLUMNS})
+
+
+def _next_renem_chunk(reader) -> Optional[BytesIO]:
+    """Lê e limpa o próximo lote do CSV, já reescrito como CSV para o COPY"""
+    for batch in reader:
+        if not batch.num_rows:
+            continue
+        buffer = BytesIO()
+        pacsv.write_csv(
+            _clean_renem_batch(batch), buffer,
+            write_options=pacsv.WriteOptions(include_header=False)
         )
-    ).offset(skip).limit(limit).all()
+        buffer.seek(0)
+        return buffer
+    return None
 
-def ingest_renem_data_from_csv(db: Session, csv_file: IO[bytes]):
+
+async def ingest_renem_data_from_csv(db: AsyncSession, csv_file: IO[bytes]):
+    try:
+        # Pular as primeiras linhas de cabeçalho informativo no CSV; leitura
+        # em lotes, sem carregar o arquivo inteiro na memória
+        reader = await asyncio.to_thread(
+            pacsv.open_csv,
+            csv_file,
+            read_options=pacsv.ReadOptions(
+                skip_rows=6, encoding='utf-8', block_size=INGEST_BLOCK_SIZE
+            ),
+            parse_options=pacsv.ParseOptions(delimiter=','),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=list(RENEM_COLUMNS),
+                include_missing_columns=True,
+                column_types={name: pa.string() for name in RENEM_COLUMNS}
+            )
+        )
+    except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+        raise CSVIngestError(f"CSV do RENEM inválido: {e}") from e
+    
+    items_read = 0
+    items_ingested = 0
+    items_updated = 0
     try:
-        # Pular as primeiras linhas de cabeçalho informativo no CSV
-        df = pd.read_csv(csv_file, skiprows=6, encoding='utf-8', sep=',')
-        
-        # Renomear colunas para corresponder ao nosso modelo
-        df.rename(columns={
-            'Cod. Item': 'item_code',
-            'Item': 'name',
-            'Definição': 'description',
-            'R$ Valor Sugerido': 'suggested_price'
-        }, inplace=True)
-        
-        items_to_add = []
-        for _, row in df.iterrows():
-            # Limpeza de dados
-            price_str = row.get('suggested_price')
-            price = None
-            if pd.notna(price_str):
-                try:
-                    price = float(str(price_str).replace('.', '').replace(',', '.'))
-                except (ValueError, TypeError):
-                    price = None
+        while True:
+            # Leitura e limpeza (CPU) fora do event loop
+            buffer = await asyncio.to_thread(_next_renem_chunk, reader)
+            if buffer is None:
+                break
             
-            item_data = schemas.CatalogItemCreate(
-                name=row.get('name'),
-                description=row.get('description'),
-                item_code=str(row.get('item_code')),
-                suggested_price=price,
-                source="RENEM",
-                item_type="Equipamento"
+            # O DDL abre a transação da sessão; o COPY roda nela, direto na
+            # conexão do asyncpg, sem INSERTs linha a linha
+            await db.execute(text(_STAGING_DDL))
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            status = await raw_connection.driver_connection.copy_to_table(
+                'renem_staging', source=buffer, columns=COPY_COLUMNS, format='csv'
             )
+            items_read += int(status.split()[-1])
             
-            db_item = models.CatalogItem(**item_data.dict())
-            items_to_add.append(db_item)
-        
-        db.bulk_save_objects(items_to_add)
-        db.commit()
-        return {"status": "success", "items_ingested": len(items_to_add)}
-    except Exception as e:
-        db.rollback()
-        print(f"Error ingesting RENEM data: {e}")
-        return {"status": "error", "detail": str(e)}
\ No newline at end of file
+            # Itens já existentes (mesma fonte e item_code) são atualizados:
+            # reenviar o arquivo, inclusive após uma falha no meio, não
+            # duplica o catálogo
+            inserted, updated = (await db.execute(text(_STAGING_MERGE))).one()
+            items_ingested += inserted
+            items_updated += updated
+            await db.commit()
+    except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+        await db.rollback()
+        raise CSVIngestError(f"CSV do RENEM inválido: {e}") from e
+    except (SQLAlchemyError, asyncpg.PostgresError, CSVIngestError):
+        await db.rollback()
+        raise
+    
+    return {
+        "status": "success",
+        "items_ingested": items_ingested,
+        "items_updated": items_updated,
+        "items_skipped": items_read - items_ingested - items_updated
+    }
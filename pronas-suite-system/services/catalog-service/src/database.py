@@ -1,11 +1,90 @@
+import asyncio
 import os
-from sqlalchemy import create_engine
+from uuid import uuid4
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
+# Com o PgBouncer (modo transaction) à frente do Postgres, o serviço conecta
+# por POOLED_DATABASE_URL; o Alembic continua direto no Postgres
+POOLED_DATABASE_URL = os.getenv("POOLED_DATABASE_URL")
+# O Alembic segue com o driver síncrono (psycopg2); o serviço usa o asyncpg
+ASYNC_DATABASE_URL = make_url(POOLED_DATABASE_URL or SQLALCHEMY_DATABASE_URL).set(drivername="postgresql+asyncpg")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Pool de conexões do serviço (por processo); o Alembic usa NullPool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+# Recicla conexões antes de timeouts de proxies/servidor
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+
+# Inserts em lote (ORM add_all / executemany) viram INSERTs de várias
+# linhas, em páginas deste tamanho, em vez de uma ida ao banco por linha.
+# use_insertmanyvalues e a página de 1000 são o padrão do SQLAlchemy 2.0:
+# ficam explícitos para fixá-lo no engine e permitir ajustar a página
+DB_INSERT_PAGE_SIZE = int(os.getenv("DB_INSERT_PAGE_SIZE", 1000))
+
+# No modo transaction cada transação pode usar outra conexão do servidor:
+# prepared statements em cache ou com nome fixo não sobrevivem
+PGBOUNCER_CONNECT_ARGS = {
+    "statement_cache_size": 0,
+    "prepared_statement_cache_size": 0,
+    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__"
+}
+
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_pre_ping=True,
+    pool_recycle=DB_POOL_RECYCLE,
+    use_insertmanyvalues=True,
+    insertmanyvalues_page_size=DB_INSERT_PAGE_SIZE,
+    connect_args=PGBOUNCER_CONNECT_ARGS if POOLED_DATABASE_URL else {}
+)
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+# Réplica de leitura (streaming replication), opcional: sem DATABASE_READ_URL
+# as leituras seguem no primário. Atrás do mesmo pooler que o primário
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+if DATABASE_READ_URL:
+    read_engine = create_async_engine(
+        make_url(DATABASE_READ_URL).set(drivername="postgresql+asyncpg"),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        pool_recycle=DB_POOL_RECYCLE,
+        connect_args=PGBOUNCER_CONNECT_ARGS if POOLED_DATABASE_URL else {}
+    )
+else:
+    read_engine = engine
+# Transações READ ONLY: uma escrita acidental num endpoint de leitura falha
+# no banco em vez de passar despercebida
+ReadSessionLocal = async_sessionmaker(
+    read_engine.execution_options(postgresql_readonly=True),
+    class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def warm_up_pool():
+    """Abre as DB_POOL_SIZE conexões de cada pool antes de o serviço receber tráfego"""
+    # Conexões abertas ao mesmo tempo (cada uma num checkout próprio) e
+    # devolvidas em seguida: ficam no pool, já autenticadas
+    async def _checkout(pool_engine):
+        async with pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    engines = {engine, read_engine}
+    await asyncio.gather(*(_checkout(e) for e in engines for _ in range(DB_POOL_SIZE)))
+
+async def dispose_engines():
+    """Fecha as conexões do primário e da réplica"""
+    for pool_engine in {engine, read_engine}:
+        await pool_engine.dispose()
 
 Base = declarative_base()
\ No newline at end of file
@@ -1,55 +1,125 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache.decorator import cache
+from arq import create_pool
+from arq.jobs import Job, JobStatus
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+import asyncio
+import logging
 
-from . import crud, schemas
-from .database import SessionLocal
+from . import crud, schemas, storage
+from .cache import SEARCH_CACHE_NAMESPACE, init_response_cache, query_key_builder
+from .database import ReadSessionLocal, dispose_engines, warm_up_pool
+from .worker import REDIS_SETTINGS, enqueue_ingest
+
+logger = logging.getLogger(__name__)
+
+# Resultados de busca em cache por alguns minutos (invalidados na ingestão)
+SEARCH_CACHE_TTL = 300
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Aquece o pool de conexões e inicializa o cache e a fila de ingestão no Redis"""
+    await warm_up_pool()
+    redis_client = init_response_cache()
+    # Ingestões do RENEM, executadas por src.worker
+    app.state.jobs = await create_pool(REDIS_SETTINGS)
+    yield
+    await app.state.jobs.aclose()
+    await redis_client.aclose()
+    await dispose_engines()
 
 app = FastAPI(
     title="Serviço de Catálogo",
     description="Fornece acesso a um banco de dados consolidado de equipamentos, materiais e serviços.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson em vez do json da stdlib para serializar as respostas
+    default_response_class=ORJSONResponse
 )
 
+# Erros inesperados: registrados no log, sem detalhes internos na resposta
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    logger.error(f"Erro não tratado em {request.url.path}", exc_info=exc)
+    return ORJSONResponse(status_code=500, content={"detail": "Erro interno do servidor."})
+
 # --- Dependência ---
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_read_db():
+    """Sessão somente leitura (réplica, quando configurada)"""
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # --- Endpoints ---
 
-@app.get("/catalog/search", response_model=List[schemas.CatalogItem])
-def search_catalog_items(q: str, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+def parse_search_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """Decodifica o cursor "similaridade:id" devolvido pela busca"""
+    if cursor is None:
+        return None
+    try:
+        score, item_id = cursor.split(":")
+        return float(score), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Cursor de paginação inválido.")
+
+# response_model=None: a página já sai validada daqui, sem nova validação
+# pelo FastAPI; o schema segue documentado em responses
+@app.get("/catalog/search", response_model=None, responses={200: {"model": schemas.CatalogSearchPage}})
+@cache(expire=SEARCH_CACHE_TTL, namespace=SEARCH_CACHE_NAMESPACE, key_builder=query_key_builder)
+async def search_catalog_items(
+    q: str, cursor: Optional[str] = None, limit: int = 50, db: AsyncSession = Depends(get_read_db)
+) -> schemas.CatalogSearchPage:
     """
     Busca por itens no catálogo com base numa query de texto.
     Este endpoint é público para ser consumido por outros serviços.
     """
     if not q:
-        return []
-    items = crud.search_items(db, query=q, skip=skip, limit=limit)
-    return items
-
-@app.post("/catalog/ingest-renem-csv", status_code=status.HTTP_201_CREATED)
-def upload_renem_csv(
-    file: UploadFile = File(...), 
-    db: Session = Depends(get_db)
-):
+        return schemas.CatalogSearchPage(items=[])
+    rows = await crud.search_items(db, query=q, after=parse_search_cursor(cursor), limit=limit)
+    # Modelos Pydantic (não objetos ORM) para poderem ser serializados no cache
+    items = [schemas.CatalogItem.model_validate(item) for item, _ in rows]
+    
+    # Página incompleta: não há mais resultados depois dela
+    next_cursor = None
+    if rows and len(rows) == limit:
+        last_item, last_score = rows[-1]
+        next_cursor = f"{last_score!r}:{last_item.id}"
+    return schemas.CatalogSearchPage(items=items, next_cursor=next_cursor)
+
+@app.post("/catalog/ingest-renem-csv", status_code=status.HTTP_202_ACCEPTED)
+async def upload_renem_csv(request: Request, file: UploadFile = File(...)):
     """
-    Endpoint para carregar e processar o arquivo CSV do RENEM.
+    Endpoint para carregar o arquivo CSV do RENEM.
+    O arquivo é guardado no MinIO e processado em segundo plano; o
+    andamento é consultado em /catalog/ingest-jobs/{job_id}.
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload a CSV.")
     
-    result = crud.ingest_renem_data_from_csv(db, file.file)
-    if result["status"] == "error":
-        raise HTTPException(status_code=500, detail=result["detail"])
-        
-    return result
+    object_key = await asyncio.to_thread(storage.save_upload, file.file)
+    job = await enqueue_ingest(request.app.state.jobs, object_key)
+    return {"job_id": job.job_id, "status": "queued"}
+
+@app.get("/catalog/ingest-jobs/{job_id}")
+async def get_ingest_job(job_id: str, request: Request):
+    """Situação de uma ingestão do RENEM (e as contagens, quando concluída)"""
+    job = Job(job_id, request.app.state.jobs)
+    job_status = await job.status()
+    if job_status == JobStatus.not_found:
+        raise HTTPException(status_code=404, detail="Job de ingestão não encontrado")
+    if job_status != JobStatus.complete:
+        return {"job_id": job_id, "status": job_status.value}
+    
+    info = await job.result_info()
+    if info.success:
+        return {"job_id": job_id, "status": "complete", "result": info.result}
+    # CSV inválido é erro do usuário; os demais não expõem detalhes internos
+    detail = str(info.result) if isinstance(info.result, crud.CSVIngestError) else "Erro interno do servidor."
+    return {"job_id": job_id, "status": "failed", "detail": detail}
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Endpoint de health check para o Kubernetes."""
     return {"status": "ok"}
\ No newline at end of file
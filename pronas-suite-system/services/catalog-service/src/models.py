@@ -1,9 +1,18 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from .database import Base
 
 class CatalogItem(Base):
     __tablename__ = "catalog_items"
+    __table_args__ = (
+        # Trigramas (pg_trgm) para a busca por ILIKE '%q%' em search_items
+        Index("ix_catalog_name_trgm", "name",
+              postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_catalog_desc_trgm", "description",
+              postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+        # Códigos são únicos dentro de cada fonte; alvo do upsert da ingestão
+        UniqueConstraint("source", "item_code", name="uq_catalog_source_itemcode"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
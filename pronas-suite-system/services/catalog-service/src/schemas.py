@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 from datetime import datetime
 
 class CatalogItemBase(BaseModel):
@@ -18,5 +18,9 @@ class CatalogItem(CatalogItemBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class CatalogSearchPage(BaseModel):
+    items: List[CatalogItem]
+    # Cursor opaco a enviar como "cursor" para a próxima página (None na última)
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""Armazenamento dos uploads do RENEM no MinIO/S3 até a ingestão"""
+from typing import IO
+from urllib.parse import urlparse
+from minio import Minio
+import os
+import uuid
+
+S3_ENDPOINT = os.getenv("S3_ENDPOINT", "http://localhost:9000")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY", "")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY", "")
+RENEM_UPLOAD_BUCKET = os.getenv("RENEM_UPLOAD_BUCKET", "renem-uploads")
+
+# Partes do upload multipart (o tamanho total do arquivo não é conhecido)
+UPLOAD_PART_SIZE = 10 * 1024 * 1024
+
+
+def _client() -> Minio:
+    endpoint = urlparse(S3_ENDPOINT)
+    return Minio(
+        endpoint.netloc,
+        access_key=S3_ACCESS_KEY,
+        secret_key=S3_SECRET_KEY,
+        secure=endpoint.scheme == "https"
+    )
+
+
+def save_upload(file: IO[bytes]) -> str:
+    """Envia o arquivo ao bucket de uploads, em partes; retorna a chave"""
+    client = _client()
+    if not client.bucket_exists(RENEM_UPLOAD_BUCKET):
+        client.make_bucket(RENEM_UPLOAD_BUCKET)
+    
+    key = f"{uuid.uuid4().hex}.csv"
+    client.put_object(
+        RENEM_UPLOAD_BUCKET, key, file, length=-1, part_size=UPLOAD_PART_SIZE
+    )
+    return key
+
+
+def open_upload(key: str):
+    """Abre o arquivo para leitura em fluxo (chamar close() e release_conn())"""
+    return _client().get_object(RENEM_UPLOAD_BUCKET, key)
+
+
+def delete_upload(key: str):
+    """Remove o arquivo depois da ingestão"""
+    _client().remove_object(RENEM_UPLOAD_BUCKET, key)
@@ -0,0 +1,70 @@
+"""Worker da ingestão do RENEM (arq)
+
+Consome os uploads guardados no MinIO e os carrega via COPY, fora dos
+workers HTTP. Iniciar com: ``arq src.worker.WorkerSettings``
+"""
+from typing import Dict
+from arq import ArqRedis
+from arq.connections import RedisSettings
+from fastapi_cache import FastAPICache
+import asyncio
+import logging
+
+from . import crud, storage
+from .cache import REDIS_URL, SEARCH_CACHE_NAMESPACE, init_response_cache
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+REDIS_SETTINGS = RedisSettings.from_dsn(REDIS_URL)
+
+# Resultado (contagens ou erro) disponível para consulta por um dia
+INGEST_RESULT_TTL = 86400
+# Um arquivo grande do RENEM leva minutos, não segundos
+INGEST_JOB_TIMEOUT = 3600
+
+
+async def startup(ctx: Dict):
+    """Backend do cache de respostas, para invalidar as buscas"""
+    ctx["redis_cache"] = init_response_cache()
+
+
+async def shutdown(ctx: Dict):
+    """Fecha a conexão do cache de respostas"""
+    await ctx["redis_cache"].aclose()
+
+
+async def ingest_renem_csv(ctx: Dict, object_key: str) -> Dict:
+    """Carrega um CSV do RENEM já enviado ao MinIO"""
+    try:
+        stream = await asyncio.to_thread(storage.open_upload, object_key)
+        try:
+            async with SessionLocal() as db:
+                result = await crud.ingest_renem_data_from_csv(db, stream)
+        finally:
+            stream.close()
+            stream.release_conn()
+    finally:
+        # Reenviar o arquivo é seguro (ingestão idempotente): não guardar
+        # uploads que falharam
+        await asyncio.to_thread(storage.delete_upload, object_key)
+    
+    # Novos itens: buscas em cache estariam desatualizadas
+    await FastAPICache.clear(namespace=SEARCH_CACHE_NAMESPACE)
+    return result
+
+
+async def enqueue_ingest(pool: ArqRedis, object_key: str):
+    """Enfileira a ingestão de um upload; o id do job é a chave do objeto"""
+    return await pool.enqueue_job("ingest_renem_csv", object_key, _job_id=object_key)
+
+
+class WorkerSettings:
+    functions = [ingest_renem_csv]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = REDIS_SETTINGS
+    job_timeout = INGEST_JOB_TIMEOUT
+    keep_result = INGEST_RESULT_TTL
+    # Uma ingestão por vez: cada uma já ocupa o banco com COPYs grandes
+    max_jobs = 1
@@ -8,7 +8,7 @@ from alembic import context
 
 # Adicione o caminho do seu app para que o Alembic encontre seus modelos
 import sys
-sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..')))
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 
 
 from src.models import Base
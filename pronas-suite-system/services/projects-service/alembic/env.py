@@ -8,7 +8,7 @@ from alembic import context
 
 # Adicione o caminho do seu app para que o Alembic encontre seus modelos
 import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.models import Base  # Importe sua Base de modelos
 from src.database import SQLALCHEMY_DATABASE_URL
@@ -24,6 +24,7 @@ if config.config_file_name is not None:
 
 # adicione aqui o objeto MetaData do seu modelo para suporte a 'autogenerate'
 target_metadata = Base.metadata
+config.set_main_option('sqlalchemy.url', SQLALCHEMY_DATABASE_URL)
 
 def run_migrations_offline() -> None:
     """Roda migrações no modo 'offline'.
@@ -46,10 +47,8 @@ def run_migrations_online() -> None:
     Neste cenário, precisamos criar um Engine
     e associar uma conexão com o contexto.
     """
-    configuration = config.get_section(config.config_ini_section)
-    configuration['sqlalchemy.url'] = SQLALCHEMY_DATABASE_URL
     connectable = engine_from_config(
-        configuration,
+        config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
@@ -0,0 +1,34 @@
+"""add project lookup indexes
+
+Revision ID: b2c3d4e5f6a7
+Revises: a1b2c3d4e5f6
+Create Date: 2025-09-24 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2c3d4e5f6a7'
+down_revision: Union[str, None] = 'a1b2c3d4e5f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A API sempre exige institution_id; o banco passa a garantir também
+    op.alter_column('projects', 'institution_id', existing_type=sa.Integer(), nullable=False)
+    op.create_index(op.f('ix_projects_status'), 'projects', ['status'], unique=False)
+    # Também atendem filtros só por institution_id (coluna líder)
+    op.create_index('ix_projects_institution_id_status', 'projects', ['institution_id', 'status'], unique=False)
+    op.create_index('ix_projects_institution_id_id', 'projects', ['institution_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_projects_institution_id_id', table_name='projects')
+    op.drop_index('ix_projects_institution_id_status', table_name='projects')
+    op.drop_index(op.f('ix_projects_status'), table_name='projects')
+    op.alter_column('projects', 'institution_id', existing_type=sa.Integer(), nullable=True)
@@ -0,0 +1,49 @@
+from typing import Optional
+from fastapi import Request, Response
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+def query_key_builder(
+    func,
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: tuple = (),
+    kwargs: Optional[dict] = None
+) -> str:
+    """Chave pelo caminho e pela query string
+
+    Ignora os demais argumentos do endpoint (sessão do banco, usuário), que
+    mudam a cada requisição e nunca gerariam acertos.
+    """
+    params = sorted(request.query_params.multi_items())
+    return f"{namespace}:{request.url.path}:{params}"
+
+
+def init_response_cache() -> aioredis.Redis:
+    """Registra o Redis como backend do cache de respostas"""
+    client = aioredis.from_url(REDIS_URL)
+    FastAPICache.init(RedisBackend(client), prefix="projects")
+    return client
+
+
+async def invalidate_namespace(namespace: str):
+    """Limpa um namespace do cache de respostas
+
+    Chamado depois do commit da escrita: uma falha do Redis não pode virar
+    erro para o cliente. As entradas antigas expiram pelo próprio TTL.
+    """
+    try:
+        await FastAPICache.clear(namespace=namespace)
+    except RedisError as e:
+        logger.warning(f"Falha ao invalidar o cache ({namespace}): {str(e)}")
@@ -1,28 +1,64 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from . import models, schemas
 
-def get_project(db: Session, project_id: int):
-    return db.query(models.Project).filter(models.Project.id == project_id).first()
+async def get_project(db: AsyncSession, project_id: int):
+    return await db.get(models.Project, project_id)
 
-def get_projects(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).offset(skip).limit(limit).all()
+# Colunas da listagem (schemas.Project): linhas simples, sem entidades ORM
+PROJECT_LIST_COLUMNS = (
+    models.Project.id,
+    models.Project.title,
+    models.Project.description,
+    models.Project.status,
+    models.Project.institution_id
+)
 
-def create_project(db: Session, project: schemas.ProjectCreate):
-    db_project = models.Project(**project.dict())
+# Consultas montadas uma vez, na importação: por requisição só os
+# parâmetros mudam, sem reconstruir a expressão do SQLAlchemy
+_LIST_PROJECTS = (
+    select(*PROJECT_LIST_COLUMNS)
+    .order_by(models.Project.id)
+    .limit(bindparam("limit"))
+)
+# Paginação por chave (id > último visto): custo constante por página,
+# ao contrário do OFFSET, que varre e descarta as linhas anteriores
+_LIST_PROJECTS_AFTER = _LIST_PROJECTS.where(models.Project.id > bindparam("after_id"))
+_PROJECTS_BY_IDS = select(*PROJECT_LIST_COLUMNS).where(
+    models.Project.id.in_(bindparam("ids", expanding=True))
+)
+
+async def get_projects(db: AsyncSession, after_id: Optional[int] = None, limit: int = 100):
+    if after_id is None:
+        result = await db.execute(_LIST_PROJECTS, {"limit": limit})
+    else:
+        result = await db.execute(_LIST_PROJECTS_AFTER, {"after_id": after_id, "limit": limit})
+    return result.mappings().all()
+
+async def get_projects_by_ids(db: AsyncSession, ids: List[int]):
+    # Uma única consulta (id = ANY) em vez de um get_project por id; o
+    # resultado segue a ordem dos ids pedidos, ignorando os inexistentes
+    result = await db.execute(_PROJECTS_BY_IDS, {"ids": ids})
+    by_id = {row["id"]: row for row in result.mappings()}
+    return [by_id[project_id] for project_id in ids if project_id in by_id]
+
+async def create_project(db: AsyncSession, project: schemas.ProjectCreate):
+    db_project = models.Project(**project.model_dump())
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     return db_project
 
-def update_project(db: Session, project_id: int, project_update: schemas.ProjectUpdate):
-    db_project = get_project(db, project_id)
+async def update_project(db: AsyncSession, project_id: int, project_update: schemas.ProjectUpdate):
+    db_project = await get_project(db, project_id)
     if not db_project:
         return None
     
-    update_data = project_update.dict(exclude_unset=True)
+    update_data = project_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_project, key, value)
         
-    db.commit()
-    db.refresh(db_project)
+    await db.commit()
+    await db.refresh(db_project)
     return db_project
\ No newline at end of file
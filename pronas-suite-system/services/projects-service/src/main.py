@@ -1,20 +1,46 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi_cache.decorator import cache
+from contextlib import asynccontextmanager
+from typing import List, Optional
 from jose import JWTError, jwt
+from cachetools import TTLCache
 import os
+import time
 
-from . import crud, models, schemas
-from .database import SessionLocal, engine
+from . import crud, schemas
+from .cache import init_response_cache, invalidate_namespace, query_key_builder
+from .database import ReadSessionLocal, SessionLocal, dispose_engines, warm_up_pool
 
-# Alembic gerencia a criação de tabelas
-# models.Base.metadata.create_all(bind=engine)
+# As tabelas são criadas pelas migrações do Alembic (alembic upgrade head),
+# nunca na importação do módulo
+
+# Páginas da listagem em cache por pouco tempo (invalidadas a cada escrita);
+# a listagem é a mesma para todos os usuários autenticados
+PROJECTS_CACHE_TTL = 60
+PROJECTS_CACHE_NAMESPACE = "projects"
+
+# Máximo de ids por consulta em lote
+MAX_BATCH_IDS = 500
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Aquece o pool de conexões e inicializa o cache de respostas no Redis"""
+    await warm_up_pool()
+    redis_client = init_response_cache()
+    yield
+    await redis_client.aclose()
+    await dispose_engines()
 
 app = FastAPI(
     title="Serviço de Projetos",
     description="Gerencia todos os projetos do sistema PRONAS/PCD.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson em vez do json da stdlib para serializar as respostas
+    default_response_class=ORJSONResponse
 )
 
 # Configuração de Segurança
@@ -22,12 +48,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token") # O endpoint real e
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "fallback-secret-key")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Tokens já verificados: token -> (username, exp). A expiração do próprio
+# token é conferida a cada acerto, então um token vencido nunca é aceito
+_verified_tokens = TTLCache(maxsize=10_000, ttl=60)
+
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
+
+async def get_read_db():
+    """Sessão somente leitura (réplica, quando configurada)"""
+    async with ReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
@@ -35,6 +67,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    # Token já verificado e ainda dentro do prazo: sem novo HMAC
+    cached = _verified_tokens.get(token)
+    if cached is not None and (cached[1] is None or cached[1] > time.time()):
+        return {"username": cached[0]}
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -42,49 +79,77 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    
+    _verified_tokens[token] = (username, payload.get("exp"))
     return {"username": username}
 
 @app.post("/projects/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
-def create_project(
+async def create_project(
     project: schemas.ProjectCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    return crud.create_project(db=db, project=project)
+    db_project = await crud.create_project(db=db, project=project)
+    await invalidate_namespace(PROJECTS_CACHE_NAMESPACE)
+    return db_project
 
-@app.get("/projects/", response_model=List[schemas.Project])
-def read_projects(
-    skip: int = 0,
+# GETs de alto volume: response_model=None evita que o FastAPI revalide a
+# resposta já montada a partir do banco; o schema segue documentado em responses
+@app.get("/projects/", response_model=None, responses={200: {"model": schemas.ProjectPage}})
+@cache(expire=PROJECTS_CACHE_TTL, namespace=PROJECTS_CACHE_NAMESPACE, key_builder=query_key_builder)
+async def read_projects(
+    after_id: Optional[int] = None,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+) -> schemas.ProjectPage:
+    projects = await crud.get_projects(db, after_id=after_id, limit=limit)
+    # Modelos Pydantic (serializáveis no cache) direto das linhas
+    items = [schemas.Project.model_validate(dict(project)) for project in projects]
+    # Página incompleta: não há mais projetos depois dela
+    next_cursor = items[-1].id if items and len(items) == limit else None
+    return schemas.ProjectPage(items=items, next_cursor=next_cursor)
+
+# Declarada antes de /projects/{project_id} para "batch" não ser lido como id
+@app.get("/projects/batch", response_model=None, responses={200: {"model": List[schemas.Project]}})
+async def read_projects_batch(
+    ids: List[int] = Query(...),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
 ):
-    projects = crud.get_projects(db, skip=skip, limit=limit)
-    return projects
+    """Vários projetos numa só consulta (?ids=1&ids=2), na ordem pedida"""
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=422, detail=f"Máximo de {MAX_BATCH_IDS} ids por consulta")
+    # Ids repetidos são consultados e devolvidos uma única vez
+    unique_ids = list(dict.fromkeys(ids))
+    projects = await crud.get_projects_by_ids(db, ids=unique_ids)
+    # As linhas já têm exatamente as colunas de schemas.Project
+    return ORJSONResponse(content=[dict(project) for project in projects])
 
-@app.get("/projects/{project_id}", response_model=schemas.Project)
-def read_project(
+@app.get("/projects/{project_id}", response_model=None, responses={200: {"model": schemas.Project}})
+async def read_project(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user)
-):
-    db_project = crud.get_project(db, project_id=project_id)
+) -> schemas.Project:
+    db_project = await crud.get_project(db, project_id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
-    return db_project
+    return schemas.Project.model_validate(db_project)
 
 @app.put("/projects/{project_id}", response_model=schemas.Project)
-def update_project(
+async def update_project(
     project_id: int,
     project: schemas.ProjectUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user)
 ):
-    db_project = crud.update_project(db, project_id=project_id, project_update=project)
+    db_project = await crud.update_project(db, project_id=project_id, project_update=project)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Projeto não encontrado")
+    await invalidate_namespace(PROJECTS_CACHE_NAMESPACE)
     return db_project
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
\ No newline at end of file
@@ -1,12 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .database import Base
 
 class Project(Base):
     __tablename__ = "projects"
+    __table_args__ = (
+        # Listagens por instituição, filtradas por status ou paginadas por id
+        Index("ix_projects_institution_id_status", "institution_id", "status"),
+        Index("ix_projects_institution_id_id", "institution_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True)
     description = Column(Text)
-    status = Column(String, default="Em Análise")
-    institution_id = Column(Integer) # Em um sistema real, seria uma FK para a tabela de instituições
\ No newline at end of file
+    status = Column(String, index=True, default="Em Análise")
+    institution_id = Column(Integer, nullable=False) # Em um sistema real, seria uma FK para a tabela de instituições
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
 
 class ProjectBase(BaseModel):
     title: str
@@ -18,5 +18,9 @@ class Project(ProjectBase):
     id: int
     status: str
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class ProjectPage(BaseModel):
+    items: List[Project]
+    # id a enviar como after_id para a próxima página (None na última)
+    next_cursor: Optional[int] = None
\ No newline at end of file